@@ -0,0 +1,48 @@
+# admin.py - 단계별 소요 시간 확인 (main.py의 숨은 페이지: /admin)
+# APP_TELEMETRY=1 로 서버를 띄웠을 때 이 프로세스에서 모은 측정값을 보여 줌
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from reaction_sketch import histogram
+from telemetry import ENABLED, METRICS_PATH, reset, snapshot, stage_sketch, write_metrics
+
+st.title("🛠️ 단계별 소요 시간")
+
+if not ENABLED:
+    st.warning("측정이 꺼져 있습니다. `APP_TELEMETRY=1 streamlit run main.py` 로 실행하세요.")
+
+rows = snapshot()
+if not rows:
+    st.info("아직 측정값이 없습니다.")
+    st.stop()
+
+# 마지막 측정 시각은 브라우저 시간대로 (알 수 없으면 서버의 현지 시간대)
+try:
+    local_zone = ZoneInfo(st.context.timezone) if st.context.timezone else None
+except (ZoneInfoNotFoundError, ValueError):
+    local_zone = None
+
+# 총 소요 시간이 큰 단계부터
+table = pd.DataFrame(rows).set_index("stage")
+table["max"] = table["max"] * 1000
+table["last"] = [datetime.fromtimestamp(t, local_zone).strftime("%H:%M:%S") for t in table["last"]]
+st.dataframe(
+    table.rename(columns={"count": "횟수", "mean": "평균(ms)", "p50": "p50(ms)", "p90": "p90(ms)",
+                          "p99": "p99(ms)", "max": "최대(ms)", "total": "합계(초)", "last": "마지막"}).round(2),
+    use_container_width=True,
+)
+
+# 선택한 단계의 분포
+name = st.selectbox("분포를 볼 단계", list(table.index))
+values, counts = histogram(stage_sketch(name))
+st.bar_chart(pd.DataFrame({"소요 시간(ms)": values.round(2), "횟수": counts}).set_index("소요 시간(ms)"))
+
+col1, col2 = st.columns(2)
+if col1.button("💾 지금 파일로 저장"):
+    write_metrics()
+    st.success(f"{METRICS_PATH}에 저장했습니다.")
+if col2.button("🧹 초기화"):
+    reset()
+    st.rerun()
@@ -1,30 +1,61 @@
 import streamlit as st
 import folium
+import html
+import math
+import xml.etree.ElementTree as ET
 from streamlit_folium import st_folium
-import urllib.parse
-import json
+from telemetry import span
+from bookmark_codec import decode_bookmarks, encode_bookmarks
+from bookmark_io import FORMATS, MIME_TYPES, detect_format, export_bookmarks, import_bookmarks, validate_bookmarks
+from bookmark_map import MAX_MARKERS, bounds_box, cluster_cell, estimate_box
+from bookmark_store import (
+    add_bookmark, add_bookmarks, clusters_in_box, connect, count_bookmarks, count_in_box, delete_bookmark,
+    delete_bookmarks, get_bookmarks, list_page, nearest, within_box, within_radius
+)
 
 # 페이지 설정
 st.set_page_config(page_title="📍 공유 가능한 북마크 지도", layout="wide")
 st.title("📍 나만의 북마크 지도 만들기 & 공유하기")
 st.markdown("장소를 북마크하고 친구와 공유할 수 있어요!")
 
-# 북마크 디코딩 함수
+# 북마크 디코딩 함수 (압축 형식 v1 + 예전 JSON 링크 모두 지원)
 def load_bookmarks_from_query():
     query_params = st.query_params  # Streamlit 1.30 이후 권장 방식
     if "data" in query_params:
         try:
-            decoded_data = urllib.parse.unquote(query_params["data"])
-            bookmarks = json.loads(decoded_data)
-            return bookmarks
-        except:
+            return decode_bookmarks(query_params["data"])
+        except ValueError:
             st.warning("❌ 북마크 데이터를 불러오는 중 문제가 발생했습니다.")
             return []
     return []
 
-# 세션 상태 초기화 (한 번만 실행)
-if "bookmarks" not in st.session_state:
-    st.session_state.bookmarks = load_bookmarks_from_query()
+# 모든 세션이 함께 쓰는 북마크 저장소 (SQLite + R-tree)
+@st.cache_resource
+def get_store():
+    return connect()
+
+store = get_store()
+PAGE_SIZE = 20
+
+# 세션 상태 초기화 (한 번만 실행) - 세션에는 이 세션이 새로 넣은 북마크 id와 현재 페이지만 보관
+# 공유 링크의 북마크는 이 세션에만 보여 주고, 사용자가 저장 버튼을 눌러야 공유 저장소에 들어감
+if "bookmark_ids" not in st.session_state:
+    shared, invalid = validate_bookmarks(load_bookmarks_from_query())
+    if invalid:
+        st.warning(f"⚠️ 공유 링크의 북마크 중 좌표가 잘못된 {invalid}개는 건너뛰었습니다.")
+    st.session_state.bookmark_ids = []
+    st.session_state.shared_bookmarks = shared
+    st.session_state.bookmark_page = 0
+
+# 🔗 공유 링크로 받은 북마크 (아직 저장하지 않음)
+shared = st.session_state.shared_bookmarks
+if shared:
+    st.info(f"🔗 공유 링크로 받은 북마크 {len(shared)}개가 지도에 주황색으로 표시됩니다. 저장하기 전에는 이 화면에서만 보입니다.")
+    if st.button("📥 공유 지도에 저장"):
+        # 이름과 좌표가 같은 것이 이미 있으면 다시 넣지 않고, 남의 id를 내 것으로 삼지도 않음
+        added = add_bookmarks(store, shared, dedupe=True)
+        st.session_state.bookmark_ids += [bookmark_id for bookmark_id, created in added if created]
+        st.session_state.shared_bookmarks = shared = []
 
 # 🧾 북마크 추가 폼
 with st.form("add_bookmark_form"):
@@ -40,54 +71,141 @@ with st.form("add_bookmark_form"):
 
     if submitted:
         if name.strip() and lat and lon:
-            new_mark = {
-                "name": name,
-                "description": description,
-                "lat": lat,
-                "lon": lon
-            }
-            st.session_state.bookmarks.append(new_mark)
+            new_id, created = add_bookmark(store, name, description, lat, lon)
+            if created:
+                st.session_state.bookmark_ids.append(new_id)
             st.success(f"✅ '{name}' 북마크가 추가되었습니다.")
         else:
             st.warning("⚠️ 모든 필드를 올바르게 입력해주세요.")
 
-# 지도 초기 위치 설정
-if st.session_state.bookmarks:
-    last = st.session_state.bookmarks[-1]
-    center = [last["lat"], last["lon"]]
+# 📦 대량 가져오기 / 내보내기
+with st.expander("📦 북마크 파일 가져오기 / 내보내기 (CSV, GeoJSON, KML)"):
+    uploaded = st.file_uploader("가져올 파일", type=["csv", "geojson", "json", "kml"])
+    if uploaded is not None and st.button("📥 가져오기"):
+        fmt = detect_format(uploaded.name)
+        bar = st.progress(0.0, text="가져오는 중...")
+        try:
+            result = import_bookmarks(
+                store, uploaded, fmt,
+                progress=lambda rows, done: bar.progress(done, text=f"{rows:,}행 처리 중...")
+            )
+            bar.progress(1.0, text="완료")
+            st.success(f"✅ {result['added']:,}개 추가 (중복 {result['duplicates']:,}개, 잘못된 좌표 {result['invalid']:,}개 건너뜀)")
+        except (ValueError, ET.ParseError) as e:
+            st.error(f"❌ 파일을 읽을 수 없습니다: {e}")
+
+    col1, col2 = st.columns([1, 3])
+    export_format = col1.selectbox("내보내기 형식", list(FORMATS), format_func=FORMATS.get)
+    if col2.button("📤 내보내기 파일 만들기"):
+        col2.download_button(
+            "💾 다운로드", export_bookmarks(store, export_format),
+            file_name=f"bookmarks.{export_format}", mime=MIME_TYPES[export_format]
+        )
+
+# 지도 초기 위치 설정 (사용자가 옮긴 화면이 있으면 그 위치 유지, 새 북마크를 추가하면 그 위치로 이동)
+view = st.session_state.get("bookmark_map")
+if submitted or not view or not view.get("center"):
+    last = get_bookmarks(store, st.session_state.bookmark_ids[-1:]) or shared[-1:]
+    if last:
+        center = [last[0]["lat"], last[0]["lon"]]
+    else:
+        center = [37.5665, 126.9780]  # 기본: 서울
+    zoom = view["zoom"] if view and view.get("zoom") else 12
+    box = estimate_box(center, zoom)
 else:
-    center = [37.5665, 126.9780]  # 기본: 서울
-
-# 지도 생성 및 마커 추가
-m = folium.Map(location=center, zoom_start=12)
-for mark in st.session_state.bookmarks:
-    popup_html = f"<b>{mark['name']}</b><br>{mark['description']}"
-    folium.Marker(
-        [mark["lat"], mark["lon"]],
-        tooltip=mark["name"],
-        popup=popup_html,
-        icon=folium.Icon(color="blue", icon="bookmark")
-    ).add_to(m)
-
-# 지도 표시
-st_data = st_folium(m, height=600, width=1000)
-
-# 북마크 목록 출력
-if st.session_state.bookmarks:
+    center = [view["center"]["lat"], view["center"]["lng"]]
+    zoom = view["zoom"]
+    box = bounds_box(view["bounds"]) if view.get("bounds") else estimate_box(center, zoom)
+
+# 화면 안에 있는 북마크만 R-tree로 찾아 마커로 추가 (많으면 SQL에서 격자 단위로 묶기)
+with span("app.query_bookmarks"):
+    visible = count_in_box(store, *box)
+    if visible > MAX_MARKERS:
+        marks = []
+        clusters = clusters_in_box(store, *box, cluster_cell(zoom))
+    else:
+        marks = within_box(store, *box)
+        clusters = []
+with span("app.folium_map"):
+    m = folium.Map(location=center, zoom_start=zoom)
+    layer = folium.FeatureGroup(name="북마크")
+    # 이름/설명은 다른 사용자가 넣은 값이므로 HTML로 해석되지 않게 이스케이프
+    for mark, color in [(mark, "blue") for mark in marks] + [(mark, "orange") for mark in shared]:
+        name = html.escape(mark["name"])
+        popup_html = f"<b>{name}</b><br>{html.escape(mark['description'])}"
+        folium.Marker(
+            [mark["lat"], mark["lon"]],
+            tooltip=name,
+            popup=popup_html,
+            icon=folium.Icon(color=color, icon="bookmark")
+        ).add_to(layer)
+    for lat_, lon_, count, _ in clusters:
+        folium.CircleMarker(
+            [lat_, lon_],
+            radius=8 + 4 * math.log10(count),
+            tooltip=f"{count}개 북마크 (확대하면 펼쳐집니다)",
+            color="blue", fill=True, fill_opacity=0.6
+        ).add_to(layer)
+
+# 지도 표시 (레이어만 갱신, 화면 이동/줌 변화만 서버로 전달)
+with span("app.st_folium"):
+    st_data = st_folium(
+        m, key="bookmark_map", height=600, width=1000,
+        center=center, zoom=zoom, feature_group_to_add=layer,
+        returned_objects=["bounds", "zoom", "center"]
+    )
+total = count_bookmarks(store)
+st.caption(f"화면에 보이는 북마크 {visible}개 / 전체 {total}개")
+
+# 근처 북마크 찾기 (R-tree 범위 검색 후 실제 거리로 정렬)
+with st.expander("🧭 근처 북마크 찾기"):
+    col1, col2, col3, col4 = st.columns(4)
+    near_lat = col1.number_input("기준 위도", value=float(center[0]), format="%.6f")
+    near_lon = col2.number_input("기준 경도", value=float(center[1]), format="%.6f")
+    near_n = col3.number_input("개수", min_value=1, max_value=100, value=5)
+    radius_km = col4.number_input("반경(km, 0이면 제한 없음)", min_value=0.0, value=0.0)
+    if radius_km > 0:
+        found = within_radius(store, near_lat, near_lon, radius_km)[:int(near_n)]
+    else:
+        found = nearest(store, near_lat, near_lon, int(near_n))
+    for bm in found:
+        st.markdown(f"**{bm['name']}** · {bm['distance_km']:.2f} km  \n📍 ({bm['lat']}, {bm['lon']})")
+    if not found:
+        st.markdown("검색된 북마크가 없습니다.")
+
+# 북마크 목록 출력 (최근 추가 순, 한 페이지씩). 삭제 버튼은 이 세션이 추가한 북마크에만 표시
+if total:
     st.markdown("### 📌 북마크 목록")
-    for i, bm in enumerate(st.session_state.bookmarks, 1):
-        st.markdown(f"**{i}. {bm['name']}**  \n📍 ({bm['lat']}, {bm['lon']})  \n📝 {bm['description']}  \n---")
+    pages = (total - 1) // PAGE_SIZE + 1
+    page = min(st.session_state.bookmark_page, pages - 1)
+    mine = set(st.session_state.bookmark_ids)
+    for i, bm in enumerate(list_page(store, page, PAGE_SIZE), page * PAGE_SIZE + 1):
+        col_text, col_delete = st.columns([10, 1])
+        col_text.markdown(f"**{i}. {bm['name']}**  \n📍 ({bm['lat']}, {bm['lon']})  \n📝 {bm['description']}")
+        if bm["id"] in mine and col_delete.button("🗑️", key=f"delete_{bm['id']}"):
+            delete_bookmark(store, bm["id"])
+            st.session_state.bookmark_ids.remove(bm["id"])
+            st.rerun()
+    col_prev, col_info, col_next = st.columns([1, 4, 1])
+    if col_prev.button("◀ 이전", disabled=page == 0):
+        st.session_state.bookmark_page = page - 1
+        st.rerun()
+    if col_next.button("다음 ▶", disabled=page >= pages - 1):
+        st.session_state.bookmark_page = page + 1
+        st.rerun()
+    col_info.caption(f"{page + 1} / {pages} 페이지")
 
-# 공유 링크 생성
-if st.session_state.bookmarks:
+# 공유 링크 생성 (이 세션에서 추가/불러온 북마크)
+my_bookmarks = get_bookmarks(store, st.session_state.bookmark_ids)
+if my_bookmarks:
     st.markdown("### 🔗 공유 링크 만들기")
-    bookmark_json = json.dumps(st.session_state.bookmarks)
-    encoded = urllib.parse.quote(bookmark_json)
-    base_url = st.request.url.split("?")[0]
+    encoded = encode_bookmarks(my_bookmarks)
+    base_url = (st.context.url or "").split("?")[0]
     share_link = f"{base_url}?data={encoded}"
     st.text_input("아래 링크를 복사하여 공유하세요:", value=share_link, label_visibility="collapsed")
 
-# 초기화 버튼
-if st.button("🗑️ 모든 북마크 삭제"):
-    st.session_state.bookmarks = []
-    st.success("모든 북마크가 삭제되었습니다.")
+# 초기화 버튼 (공유 지도에서 이 세션이 추가한 북마크만 삭제)
+if st.button("🗑️ 내가 추가한 북마크 모두 삭제"):
+    delete_bookmarks(store, st.session_state.bookmark_ids)
+    st.session_state.bookmark_ids = []
+    st.success("내가 추가한 북마크가 삭제되었습니다.")
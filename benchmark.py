@@ -0,0 +1,330 @@
+# benchmark.py - 앱별 재실행 경로 성능 측정 (AppTest로 화면 없이 실행, 합성 데이터 사용)
+#
+# 사용:
+#   python benchmark.py                    전체 시나리오 실행 후 기준값과 비교
+#   python benchmark.py population_x10     일부 시나리오만
+#   python benchmark.py --quick            데이터 크기를 1/10로 (빠른 확인용)
+#   python benchmark.py --save-baseline    이번 결과를 기준값으로 저장
+#
+# 시나리오마다 새 프로세스와 임시 폴더에서 실행 (캐시/메모리가 서로 섞이지 않도록)
+# 단계마다 걸린 시간과 그 단계가 더 쓴 최대 메모리(RSS 증가분)를 기록
+# 기준값보다 시간이 TIME_TOLERANCE 이상 늘거나 메모리가 MEMORY_TOLERANCE 이상 늘면 회귀로 표시하고 종료 코드 1
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(ROOT, "bench_baseline.json")
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.20
+NOISE_SECONDS = 0.05  # 이보다 작은 차이는 회귀로 보지 않음
+NOISE_MB = 5.0
+SAMPLE_SECONDS = 0.005
+APP_TIMEOUT = 600
+
+
+# ───────────── 측정 ─────────────
+# 현재 RSS(MB). /proc이 없는 OS에서는 프로세스 최대 RSS로 대신함
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        # 리눅스는 KB, macOS는 바이트 단위
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+# 단계가 도는 동안 RSS를 SAMPLE_SECONDS마다 재서 최댓값을 기록
+# stage_peak_mb = 단계 중 최대 RSS - 단계 시작 때 RSS (앞 단계가 쓴 메모리는 빼고 이 단계가 더 쓴 양)
+@contextmanager
+def stage(results, name):
+    base = peak = _rss_mb()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(SAMPLE_SECONDS):
+            peak = max(peak, _rss_mb())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        done.set()
+        sampler.join()
+        peak = max(peak, _rss_mb())
+    results.append({"stage": name, "seconds": seconds, "stage_peak_mb": peak - base})
+
+
+def _app(script):
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(os.path.join(ROOT, script), default_timeout=APP_TIMEOUT)
+
+
+# 예외뿐 아니라 앱이 st.error로 보여 준 오류 화면도 실패로 봄 (오류 화면의 시간을 재지 않도록)
+def _check(at, script):
+    if at.exception:
+        raise RuntimeError(f"{script} 실행 중 오류: {at.exception[0].message}")
+    if at.error:
+        raise RuntimeError(f"{script} 오류 화면: {at.error[0].value}")
+    return at
+
+
+# ───────────── 합성 데이터 ─────────────
+# 합계.csv 행을 scale배로 복제 (복제본마다 시도 이름/코드를 바꿔 서로 다른 지역으로)
+def make_population_csv(path, scale):
+    source = pd.read_csv(os.path.join(ROOT, "합계.csv"), encoding="cp949", dtype=str)
+    copies = [source]
+    for k in range(1, scale):
+        copy = source.copy()
+        parts = copy["행정구역"].str.extract(r"^(\S+)(.*)\((\d{2})(\d{8})\)$")
+        codes = ((parts[2].astype(int) + k) % 90 + 10).astype(str).str.zfill(2)
+        copy["행정구역"] = parts[0] + str(k) + parts[1] + "(" + codes + parts[3] + ")"
+        copies.append(copy)
+    pd.concat(copies, ignore_index=True).to_csv(path, index=False, encoding="cp949", quoting=csv.QUOTE_ALL)
+
+
+# 합계.csv의 "_계_" 컬럼을 남/여로 나눈 남녀구분.csv (행정구역은 그대로)
+def make_gender_csv(path, total_path):
+    total = pd.read_csv(total_path, encoding="cp949", thousands=",")
+    columns = [col for col in total.columns if "_계_" in col]
+    values = total[columns].to_numpy(dtype=np.int64)
+    male = values // 2
+    gender = pd.concat([
+        total[["행정구역"]],
+        pd.DataFrame(male, columns=[col.replace("_계_", "_남_") for col in columns]),
+        pd.DataFrame(values - male, columns=[col.replace("_계_", "_여_") for col in columns]),
+    ], axis=1)
+    gender.to_csv(path, index=False, encoding="cp949", quoting=csv.QUOTE_ALL)
+
+
+def make_series_matrix(path, probes, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    gsm = [f"GSM{400000 + i}" for i in range(samples)]
+    values = rng.lognormal(5, 1, (probes, samples))
+    values[:100, samples // 2:] *= 4  # 차등 발현 probe
+    with gzip.open(path, "wt", compresslevel=1) as f:
+        f.write('!Series_platform_id\t"GPL1340"\n')
+        f.write("!Sample_geo_accession\t" + "\t".join(f'"{g}"' for g in gsm) + "\n")
+        f.write("!Sample_source_name_ch1\t" + "\t".join(
+            '"leaf control"' if i < samples // 2 else '"leaf drought"' for i in range(samples)) + "\n")
+        f.write("!series_matrix_table_begin\n")
+        f.write('"ID_REF"\t' + "\t".join(f'"{g}"' for g in gsm) + "\n")
+        for i in range(probes):
+            f.write(f'"Contig{i}_at"\t' + "\t".join(f"{v:.3f}" for v in values[i]) + "\n")
+        f.write("!series_matrix_table_end\n")
+
+
+def make_bookmarks_csv(path, count, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "name": [f"장소 {i}" for i in range(count)],
+        "description": "",
+        "lat": rng.normal(37.55, 0.3, count).round(6),
+        "lon": rng.normal(126.98, 0.4, count).round(6),
+    }).to_csv(path, index=False)
+
+
+# ───────────── 시나리오 ─────────────
+def bench_population(results, scale):
+    make_population_csv("합계.csv", scale)
+    make_gender_csv("남녀구분.csv", "합계.csv")
+    from population_data import parse_csv
+    with stage(results, "parse_csv"):
+        parse_csv("합계.csv")
+    at = _app("population.py")
+    with stage(results, "첫 실행 (캐시 생성)"):
+        _check(at.run(), "population.py")
+    with stage(results, "재실행"):
+        _check(at.run(), "population.py")
+    with stage(results, "하위 지역 비교"):
+        _check(at.radio[0].set_value("하위 지역 비교").run(), "population.py")
+
+
+def bench_project(results, probes, samples):
+    make_series_matrix("GSE17669_series_matrix.txt.gz", probes, samples)
+    at = _app("project.py")
+    with stage(results, "첫 실행 (저장소/PCA/DE/그림)"):
+        _check(at.run(), "project.py")
+    with stage(results, "재실행"):
+        _check(at.run(), "project.py")
+
+    from expression_stats import differential_expression, fit_pca
+    from gene_index import build_gene_index, search_genes
+    from geo_data import load_series, sample_conditions
+    df, meta = load_series("GSE17669", offline=True)
+    values = df.to_numpy()
+    labels = sample_conditions("GSE17669", meta)
+    with stage(results, "fit_pca"):
+        fit_pca(values, 2)
+    with stage(results, "differential_expression"):
+        differential_expression(values, labels, labels[0], labels[-1], index=df.index)
+    with stage(results, "유전자 검색 x100"):
+        index = build_gene_index(df.index.tolist())
+        for i in range(100):
+            search_genes(index, f"contig{i}")
+
+
+def bench_bookmarks(results, count):
+    make_bookmarks_csv("bookmarks.csv", count)
+    from bookmark_io import import_bookmarks
+    from bookmark_store import clusters_in_box, connect
+    conn = connect()
+    with stage(results, f"CSV 가져오기 {count:,}개"):
+        with open("bookmarks.csv", "rb") as f:
+            import_bookmarks(conn, f, "csv")
+    with stage(results, "clusters_in_box (서울 전체)"):
+        clusters_in_box(conn, 36.5, 125.5, 38.5, 128.5, 0.05)
+    at = _app("app.py")
+    with stage(results, "첫 실행"):
+        _check(at.run(), "app.py")
+    with stage(results, "재실행"):
+        _check(at.run(), "app.py")
+
+
+def bench_leaderboard(results, games, seed=0):
+    from leaderboard import open_leaderboard, submit_score, top_scores
+    rng = np.random.default_rng(seed)
+    board = open_leaderboard()
+    with stage(results, f"submit_score {games:,}판"):
+        for i in range(games):
+            hits = rng.lognormal(-1, 0.4, rng.integers(5, 40))
+            submit_score(board, f"g{i}", f"player{i % 500}", len(hits), float(hits.mean()), hits=hits, misses=2)
+    with stage(results, "top_scores x1000"):
+        for _ in range(1000):
+            top_scores(board, 5)
+    at = _app("game.py")
+    _check(at.run(), "game.py")
+    _check(at.radio[0].set_value("클래식").run(), "game.py")
+    _check(at.button[0].click().run(), "game.py")
+    at.session_state.start_time = time.time() - 60
+    with stage(results, "게임 종료 화면"):
+        _check(at.run(), "game.py")
+
+
+# 시나리오 이름 → (함수, 기본 인자, --quick 인자)
+SCENARIOS = {
+    "population_x10": (bench_population, {"scale": 10}, {"scale": 1}),
+    "population_x100": (bench_population, {"scale": 100}, {"scale": 10}),
+    "project_geo": (bench_project, {"probes": 50_000, "samples": 48}, {"probes": 5_000, "samples": 12}),
+    "bookmarks_100k": (bench_bookmarks, {"count": 100_000}, {"count": 10_000}),
+    "leaderboard_20k": (bench_leaderboard, {"games": 20_000}, {"games": 2_000}),
+}
+
+
+# 한 시나리오를 임시 폴더에서 실행 → 단계별 결과 목록
+def run_scenario(name, quick=False):
+    func, full, small = SCENARIOS[name]
+    results = []
+    sys.path.insert(0, ROOT)
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        os.chdir(workdir)
+        func(results, **(small if quick else full))
+        os.chdir(ROOT)
+    return results
+
+
+def _run_in_subprocess(name, quick):
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", name] + (["--quick"] if quick else [])
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} 실패:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ───────────── 기준값 비교 ─────────────
+def compare(current, baseline):
+    flagged = []
+    for scenario, stages in current.items():
+        old = {row["stage"]: row for row in baseline.get(scenario, [])}
+        for row in stages:
+            before = old.get(row["stage"])
+            row["regression"] = []
+            if not before:
+                continue
+            row["baseline_seconds"] = before["seconds"]
+            if (row["seconds"] > before["seconds"] * (1 + TIME_TOLERANCE)
+                    and row["seconds"] - before["seconds"] > NOISE_SECONDS):
+                row["regression"].append("시간")
+            if "stage_peak_mb" in before and row["stage_peak_mb"] > before["stage_peak_mb"] * (1 + MEMORY_TOLERANCE) \
+                    and row["stage_peak_mb"] - before["stage_peak_mb"] > NOISE_MB:
+                row["regression"].append("메모리")
+            if row["regression"]:
+                flagged.append((scenario, row["stage"]))
+    return flagged
+
+
+def print_report(current):
+    for scenario, stages in current.items():
+        print(f"\n■ {scenario}")
+        for row in stages:
+            base = row.get("baseline_seconds")
+            change = f" (기준 {base:.3f}초, {(row['seconds'] / base - 1) * 100:+.0f}%)" if base else ""
+            flag = f"  ⚠️ {'/'.join(row['regression'])} 회귀" if row.get("regression") else ""
+            print(f"  {row['stage']:<32} {row['seconds']:8.3f}초  {row['stage_peak_mb']:+8.1f}MB{change}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 재실행 경로 성능 측정")
+    parser.add_argument("scenarios", nargs="*", help=f"실행할 시나리오 (기본: 전체) {list(SCENARIOS)}")
+    parser.add_argument("--quick", action="store_true", help="데이터 크기를 1/10로")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 파일")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scenario(args.worker, args.quick)))
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {unknown}")
+    current = {}
+    for name in names:
+        print(f"실행 중: {name}", file=sys.stderr)
+        current[name] = _run_in_subprocess(name, args.quick)
+
+    # 기준값은 같은 크기(--quick 여부)끼리만 비교
+    key = "quick" if args.quick else "full"
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    flagged = compare(current, baseline.get(key, {}))
+    print_report(current)
+
+    if args.save_baseline:
+        baseline.setdefault(key, {}).update(
+            {name: [{k: row[k] for k in ("stage", "seconds", "stage_peak_mb")} for row in stages]
+             for name, stages in current.items()})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값 저장: {args.baseline}")
+        return 0
+    if flagged:
+        print(f"\n⚠️ 회귀 {len(flagged)}건: " + ", ".join(f"{s}/{st}" for s, st in flagged))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
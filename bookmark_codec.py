@@ -0,0 +1,138 @@
+# bookmark_codec.py - 북마크 공유 링크용 압축 인코딩 (app.py에서 사용)
+#
+# v1 형식: "v1." + base64url(zlib(바이너리))
+#   바이너리 = [북마크 수][문자열 표][북마크마다: Δ위도, Δ경도, 이름 번호, 설명 번호]
+#   - 위도/경도는 1e-6도 단위 정수로 바꾼 뒤 직전 북마크와의 차이만 저장 (zigzag varint)
+#   - 이름/설명은 중복 없이 문자열 표에 한 번만 넣고 번호로 참조
+# 예전 링크(URL 인코딩된 JSON 배열)도 그대로 읽을 수 있음
+
+import base64
+import binascii
+import json
+import math
+import urllib.parse
+import zlib
+
+PREFIX = "v1."
+SCALE = 1_000_000  # number_input 소수점 6자리와 같은 정밀도
+
+
+def _write_varint(out, n):
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def encode_bookmarks(bookmarks):
+    strings = {}
+    for bm in bookmarks:
+        strings.setdefault(bm["name"], len(strings))
+        strings.setdefault(bm.get("description", ""), len(strings))
+
+    out = bytearray()
+    _write_varint(out, len(bookmarks))
+    _write_varint(out, len(strings))
+    for text in strings:
+        raw = text.encode("utf-8")
+        _write_varint(out, len(raw))
+        out += raw
+
+    prev_lat = prev_lon = 0
+    for bm in bookmarks:
+        lat = round(float(bm["lat"]) * SCALE)
+        lon = round(float(bm["lon"]) * SCALE)
+        _write_varint(out, _zigzag(lat - prev_lat))
+        _write_varint(out, _zigzag(lon - prev_lon))
+        _write_varint(out, strings[bm["name"]])
+        _write_varint(out, strings[bm.get("description", "")])
+        prev_lat, prev_lon = lat, lon
+
+    packed = base64.urlsafe_b64encode(zlib.compress(bytes(out), 9)).rstrip(b"=")
+    return PREFIX + packed.decode("ascii")
+
+
+def _decode_v1(token):
+    packed = token[len(PREFIX):]
+    data = zlib.decompress(base64.urlsafe_b64decode(packed + "=" * (-len(packed) % 4)))
+
+    count, pos = _read_varint(data, 0)
+    n_strings, pos = _read_varint(data, pos)
+    strings = []
+    for _ in range(n_strings):
+        size, pos = _read_varint(data, pos)
+        strings.append(data[pos:pos + size].decode("utf-8"))
+        pos += size
+
+    bookmarks = []
+    lat = lon = 0
+    for _ in range(count):
+        d_lat, pos = _read_varint(data, pos)
+        d_lon, pos = _read_varint(data, pos)
+        name, pos = _read_varint(data, pos)
+        description, pos = _read_varint(data, pos)
+        lat += _unzigzag(d_lat)
+        lon += _unzigzag(d_lon)
+        bookmarks.append({
+            "name": strings[name],
+            "description": strings[description],
+            "lat": lat / SCALE,
+            "lon": lon / SCALE,
+        })
+    return bookmarks
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+# 예전 JSON 링크는 내용을 믿지 않고 {"name": 문자열, "description": 문자열, "lat"/"lon": 유한한 수} 목록인지 확인
+def _checked(data):
+    if not isinstance(data, list):
+        raise ValueError("북마크 목록이 아닙니다.")
+    bookmarks = []
+    for bm in data:
+        if not isinstance(bm, dict) or not isinstance(bm.get("name"), str):
+            raise ValueError("북마크 이름이 없습니다.")
+        description = bm.get("description", "")
+        if not isinstance(description, str):
+            raise ValueError("북마크 설명이 문자열이 아닙니다.")
+        if not _is_number(bm.get("lat")) or not _is_number(bm.get("lon")):
+            raise ValueError("북마크 좌표가 올바르지 않습니다.")
+        bookmarks.append({"name": bm["name"], "description": description, "lat": float(bm["lat"]), "lon": float(bm["lon"])})
+    return bookmarks
+
+
+# 링크의 data 값 → 북마크 목록. 형식이 잘못되면 ValueError
+def decode_bookmarks(token):
+    token = token.strip()
+    try:
+        if token.startswith(PREFIX):
+            return _decode_v1(token)
+        # 예전 형식: URL 인코딩된 JSON 배열
+        return _checked(json.loads(urllib.parse.unquote(token)))
+    except (IndexError, UnicodeDecodeError, zlib.error, json.JSONDecodeError, binascii.Error) as e:
+        raise ValueError(str(e)) from e
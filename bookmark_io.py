@@ -0,0 +1,265 @@
+# bookmark_io.py - 북마크 대량 가져오기/내보내기 (CSV, GeoJSON, KML)
+# 파일을 통째로 읽지 않고 batch 단위로 읽어 좌표 검증과 저장을 한 번에 처리
+
+import io
+import json
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from bookmark_store import add_bookmark_arrays, iter_all
+from telemetry import timed
+
+BATCH_SIZE = 5000
+FORMATS = {"csv": "CSV", "geojson": "GeoJSON", "kml": "KML"}
+
+# CSV 컬럼 이름 후보 (공공데이터 POI 목록에서 자주 쓰는 이름 포함)
+COLUMN_ALIASES = {
+    "name": ["name", "title", "이름", "장소", "장소명", "시설명", "명칭"],
+    "description": ["description", "desc", "설명", "주소", "도로명주소", "소재지도로명주소"],
+    "lat": ["lat", "latitude", "위도", "y"],
+    "lon": ["lon", "lng", "longitude", "경도", "x"],
+}
+
+
+def detect_format(filename):
+    ext = filename.rsplit(".", 1)[-1].lower()
+    return "geojson" if ext == "json" else ext
+
+
+def _pick(columns, kind):
+    lowered = {str(col).strip().lower(): col for col in columns}
+    for alias in COLUMN_ALIASES[kind]:
+        if alias in lowered:
+            return lowered[alias]
+    return None
+
+
+# 한글 CSV는 cp949인 경우가 많아 앞부분으로 인코딩 판단
+def _csv_encoding(file):
+    head = file.read(1 << 16)
+    file.seek(0)
+    try:
+        head.decode("utf-8")
+        return "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # 잘린 멀티바이트 문자 때문에 끝에서 실패한 경우는 utf-8로 봄
+        return "utf-8-sig" if e.start >= len(head) - 3 else "cp949"
+
+
+def iter_csv(file, batch_size=BATCH_SIZE):
+    reader = pd.read_csv(file, encoding=_csv_encoding(file), dtype=str, chunksize=batch_size)
+    for chunk in reader:
+        columns = {kind: _pick(chunk.columns, kind) for kind in COLUMN_ALIASES}
+        if columns["lat"] is None or columns["lon"] is None:
+            raise ValueError("CSV에 위도/경도(lat, lon) 컬럼이 필요합니다.")
+        yield pd.DataFrame({
+            kind: chunk[col] if col is not None else pd.Series("", index=chunk.index)
+            for kind, col in columns.items()
+        })
+
+
+# GeoJSON FeatureCollection의 features 배열을 한 개씩 읽음 (전체 JSON을 메모리에 올리지 않음)
+def _iter_json_features(text, read_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def more():
+        nonlocal buf, pos, eof
+        data = text.read(read_size)
+        if not data:
+            eof = True
+        buf = buf[pos:] + data
+        pos = 0
+
+    # 배열 시작 위치 찾기: 최상위가 배열이면 바로, 아니면 "features": [ 뒤
+    while True:
+        stripped = buf.lstrip()
+        if stripped.startswith("["):
+            pos = buf.index("[") + 1
+            break
+        at = buf.find('"features"')
+        if at != -1:
+            bracket = buf.find("[", at)
+            if bracket != -1:
+                pos = bracket + 1
+                break
+        if eof:
+            raise ValueError("GeoJSON에서 features 배열을 찾을 수 없습니다.")
+        more()
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            more()
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("GeoJSON 형식이 올바르지 않습니다.")
+            more()
+            continue
+        yield obj
+        pos = end
+
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield pd.DataFrame(batch, columns=list(COLUMN_ALIASES))
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=list(COLUMN_ALIASES))
+
+
+def _object(value):
+    return value if isinstance(value, dict) else {}
+
+
+def iter_geojson(file, batch_size=BATCH_SIZE):
+    def rows():
+        for feature in _iter_json_features(text):
+            # 객체가 아닌 항목은 좌표 없는 행으로 넘겨 검증 단계에서 잘못된 행으로 셈
+            if not isinstance(feature, dict):
+                yield "", "", None, None
+                continue
+            props = _object(feature.get("properties"))
+            geometry = _object(feature.get("geometry"))
+            coords = geometry.get("coordinates") if geometry.get("type") == "Point" else None
+            lon, lat = (coords[0], coords[1]) if isinstance(coords, list) and len(coords) >= 2 else (None, None)
+            name = next((props[k] for k in COLUMN_ALIASES["name"] if props.get(k)), "")
+            description = next((props[k] for k in COLUMN_ALIASES["description"] if props.get(k)), "")
+            yield name, description, lat, lon
+
+    text = io.TextIOWrapper(file, encoding="utf-8-sig")
+    try:
+        yield from _batched(rows(), batch_size)
+    finally:
+        # 감싼 파일이 같이 닫히지 않도록 분리
+        text.detach()
+
+
+def iter_kml(file, batch_size=BATCH_SIZE):
+    def rows():
+        for _, elem in ET.iterparse(file, events=("end",)):
+            if not elem.tag.endswith("Placemark"):
+                continue
+            name = elem.findtext("{*}name") or elem.findtext("name") or ""
+            description = elem.findtext("{*}description") or elem.findtext("description") or ""
+            coords = elem.findtext(".//{*}Point/{*}coordinates") or elem.findtext(".//Point/coordinates")
+            lon = lat = None
+            if coords:
+                parts = coords.strip().split(",")
+                if len(parts) >= 2:
+                    lon, lat = parts[0], parts[1]
+            elem.clear()
+            yield name.strip(), description.strip(), lat, lon
+
+    yield from _batched(rows(), batch_size)
+
+
+READERS = {"csv": iter_csv, "geojson": iter_geojson, "kml": iter_kml}
+
+
+# batch 전체 좌표를 한 번에 검증 → (올바른 행만 남긴 배열들, 잘못된 행 수)
+def validate_batch(frame):
+    lat = pd.to_numeric(frame["lat"], errors="coerce").to_numpy(dtype=np.float64)
+    lon = pd.to_numeric(frame["lon"], errors="coerce").to_numpy(dtype=np.float64)
+    ok = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    names = frame["name"].fillna("").astype(str).str.strip().to_numpy()
+    # 이름이 없으면 좌표로 대신 표시
+    unnamed = names == ""
+    if unnamed.any():
+        names[unnamed] = [f"({a:.5f}, {b:.5f})" for a, b in zip(lat[unnamed], lon[unnamed])]
+    descriptions = frame["description"].fillna("").astype(str).to_numpy()
+    return (names[ok].tolist(), descriptions[ok].tolist(), lat[ok], lon[ok]), int((~ok).sum())
+
+
+# 북마크 dict 목록(공유 링크 등)을 파일 가져오기와 같은 기준으로 검증 → (올바른 북마크 목록, 잘못된 수)
+def validate_bookmarks(bookmarks):
+    if not bookmarks:
+        return [], 0
+    frame = pd.DataFrame(bookmarks, columns=["name", "description", "lat", "lon"])
+    (names, descriptions, lat, lon), invalid = validate_batch(frame)
+    valid = [{"name": n, "description": d, "lat": float(a), "lon": float(b)}
+             for n, d, a, b in zip(names, descriptions, lat, lon)]
+    return valid, invalid
+
+
+# 파일 가져오기. progress(읽은 행 수, 진행률 0~1)을 batch마다 호출
+@timed("bookmarks.import")
+def import_bookmarks(conn, file, fmt, batch_size=BATCH_SIZE, progress=None):
+    file.seek(0, io.SEEK_END)
+    total_bytes = file.tell() or 1
+    file.seek(0)
+    stats = {"read": 0, "added": 0, "duplicates": 0, "invalid": 0}
+    for frame in READERS[fmt](file, batch_size):
+        (names, descriptions, lat, lon), invalid = validate_batch(frame)
+        stats["read"] += len(frame)
+        stats["invalid"] += invalid
+        if len(lat):
+            _, created = add_bookmark_arrays(conn, names, descriptions, lat, lon, dedupe=True)
+            added = sum(created)
+            stats["added"] += added
+            stats["duplicates"] += len(lat) - added
+        if progress:
+            try:
+                done = min(file.tell() / total_bytes, 1.0)
+            except (OSError, ValueError):
+                done = 0.0
+            progress(stats["read"], done)
+    return stats
+
+
+# ───────────── 내보내기 (문자열 조각을 차례로 돌려줌) ─────────────
+def _export_csv(conn):
+    header = True
+    for rows in iter_all(conn):
+        yield pd.DataFrame(rows, columns=["name", "description", "lat", "lon"]).to_csv(index=False, header=header)
+        header = False
+    if header:
+        yield "name,description,lat,lon\n"
+
+
+def _export_geojson(conn):
+    yield '{"type": "FeatureCollection", "features": ['
+    first = True
+    for rows in iter_all(conn):
+        features = [json.dumps({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [bm["lon"], bm["lat"]]},
+            "properties": {"name": bm["name"], "description": bm["description"]},
+        }, ensure_ascii=False) for bm in rows]
+        yield ("" if first else ",\n") + ",\n".join(features)
+        first = False
+    yield "]}\n"
+
+
+def _export_kml(conn):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n'
+    for rows in iter_all(conn):
+        yield "".join(
+            f"<Placemark><name>{escape(bm['name'])}</name><description>{escape(bm['description'])}</description>"
+            f"<Point><coordinates>{bm['lon']},{bm['lat']}</coordinates></Point></Placemark>\n"
+            for bm in rows)
+    yield "</Document></kml>\n"
+
+
+EXPORTERS = {"csv": _export_csv, "geojson": _export_geojson, "kml": _export_kml}
+MIME_TYPES = {"csv": "text/csv", "geojson": "application/geo+json", "kml": "application/vnd.google-earth.kml+xml"}
+
+
+def export_bookmarks(conn, fmt):
+    return "".join(EXPORTERS[fmt](conn)).encode("utf-8")
@@ -0,0 +1,25 @@
+# bookmark_map.py - 지도 화면 범위 계산과 클러스터 크기 (공간 검색은 bookmark_store의 R-tree 사용)
+
+import math
+
+MAX_MARKERS = 300      # 이보다 많이 보이면 클러스터로 묶어서 표시
+CLUSTER_PIXELS = 60    # 클러스터 한 칸의 화면 크기
+
+
+# st_folium이 돌려주는 bounds 형식 → (남, 서, 북, 동)
+def bounds_box(bounds):
+    return (bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+            bounds["_northEast"]["lat"], bounds["_northEast"]["lng"])
+
+
+# 첫 실행처럼 bounds를 아직 모를 때 중심/줌/지도 크기로 화면 범위 추정
+def estimate_box(center, zoom, width=1000, height=600):
+    deg_per_px = 360 / (256 * 2 ** zoom)
+    half_lon = deg_per_px * width / 2
+    half_lat = deg_per_px * height / 2 * math.cos(math.radians(center[0]))
+    return center[0] - half_lat, center[1] - half_lon, center[0] + half_lat, center[1] + half_lon
+
+
+# 줌 레벨에서 CLUSTER_PIXELS 크기에 해당하는 격자 크기(도)
+def cluster_cell(zoom):
+    return CLUSTER_PIXELS * 360 / (256 * 2 ** zoom)
@@ -0,0 +1,252 @@
+# bookmark_store.py - SQLite 북마크 저장소 (R-tree 공간 인덱스)
+# 세션이 끝나도 남고, 여러 사용자가 같은 지도를 공유함
+
+import math
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+DB_PATH = "bookmarks.db"
+EARTH_KM = 6371.0
+
+_write_lock = threading.Lock()
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            lat REAL NOT NULL,
+            lon REAL NOT NULL,
+            created REAL NOT NULL,
+            coord_key INTEGER
+        )""")
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS bookmark_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+    _migrate(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS bookmarks_coord_key ON bookmarks (coord_key)")
+    return conn
+
+
+# 좌표 해시: 1e-6도 단위로 반올림한 위도/경도를 하나의 64비트 정수로 (같은 위치 = 같은 키)
+def coord_keys(lat, lon):
+    lat_i = np.rint(np.asarray(lat, dtype=np.float64) * 1_000_000).astype(np.int64) + 90_000_000
+    lon_i = np.rint(np.asarray(lon, dtype=np.float64) * 1_000_000).astype(np.int64) + 180_000_000
+    return lat_i * 360_000_001 + lon_i
+
+
+# coord_key 컬럼이 없던 예전 DB 파일 보정
+def _migrate(conn):
+    columns = [row["name"] for row in conn.execute("PRAGMA table_info(bookmarks)")]
+    if "coord_key" not in columns:
+        conn.execute("ALTER TABLE bookmarks ADD COLUMN coord_key INTEGER")
+    rows = conn.execute("SELECT id, lat, lon FROM bookmarks WHERE coord_key IS NULL").fetchall()
+    if rows:
+        ids = [row["id"] for row in rows]
+        keys = coord_keys([row["lat"] for row in rows], [row["lon"] for row in rows])
+        with _write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE bookmarks SET coord_key = ? WHERE id = ?", zip(keys.tolist(), ids))
+            conn.execute("COMMIT")
+
+
+def _as_dict(row):
+    return {"id": row["id"], "name": row["name"], "description": row["description"], "lat": row["lat"], "lon": row["lon"]}
+
+
+# (coord_key, 이름) → 이미 있는 id
+def _existing(conn, keys):
+    found = {}
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        for key, name, bookmark_id in conn.execute(
+                f"SELECT coord_key, name, min(id) FROM bookmarks WHERE coord_key IN ({marks}) GROUP BY coord_key, name", chunk):
+            found[(key, name)] = bookmark_id
+    return found
+
+
+# 배열 단위 추가 → (입력 순서대로의 id 목록, 새로 추가했는지 여부 목록)
+# dedupe=True(파일 가져오기, 공유 링크)이면 이름과 좌표(coord_key)가 모두 같은 북마크가
+# 이미 있거나 배치 안에서 겹칠 때 새로 넣지 않고 기존 id를 돌려줌
+def add_bookmark_arrays(conn, names, descriptions, lats, lons, dedupe=False):
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    keys = list(zip(coord_keys(lats, lons).tolist(), names))
+    now = time.time()
+    ids = [None] * len(keys)
+    created = [False] * len(keys)
+    with _write_lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            seen = _existing(conn, list(dict.fromkeys(k for k, _ in keys))) if dedupe else {}
+            rows, repeats = [], {}  # repeats: 배치 안에서 먼저 나온 키 → 뒤에 다시 나온 입력 위치들
+            for i, key in enumerate(keys):
+                if key in seen:
+                    ids[i] = seen[key]
+                    continue
+                if dedupe:
+                    if key in repeats:
+                        repeats[key].append(i)
+                        continue
+                    repeats[key] = []
+                created[i] = True
+                rows.append((i, (names[i], descriptions[i] or "", lats[i], lons[i], now, key[0])))
+            if rows:
+                last_id = conn.execute("SELECT coalesce(max(id), 0) FROM bookmarks").fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO bookmarks (name, description, lat, lon, created, coord_key) VALUES (?, ?, ?, ?, ?, ?)",
+                    [row for _, row in rows])
+                # 새로 들어간 행을 R-tree에도 한 번에 추가
+                conn.execute("INSERT INTO bookmark_rtree SELECT id, lat, lat, lon, lon FROM bookmarks WHERE id > ?", (last_id,))
+                new_ids = [row[0] for row in conn.execute("SELECT id FROM bookmarks WHERE id > ? ORDER BY id", (last_id,))]
+                for (i, _), bookmark_id in zip(rows, new_ids):
+                    ids[i] = bookmark_id
+                    for j in repeats.get(keys[i], ()):
+                        ids[j] = bookmark_id
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return ids, created
+
+
+# 여러 개를 한 트랜잭션으로 추가 → [(id, 새로 추가했는지)]
+def add_bookmarks(conn, bookmarks, dedupe=False):
+    if not bookmarks:
+        return []
+    ids, created = add_bookmark_arrays(
+        conn,
+        [bm["name"] for bm in bookmarks],
+        [bm.get("description", "") for bm in bookmarks],
+        [bm["lat"] for bm in bookmarks],
+        [bm["lon"] for bm in bookmarks],
+        dedupe=dedupe,
+    )
+    return list(zip(ids, created))
+
+
+# 북마크 하나 추가 (같은 좌표가 있어도 항상 새로 넣음) → (id, True)
+def add_bookmark(conn, name, description, lat, lon):
+    return add_bookmarks(conn, [{"name": name, "description": description, "lat": lat, "lon": lon}])[0]
+
+
+def delete_bookmarks(conn, ids):
+    ids = list(ids)
+    if not ids:
+        return
+    marks = ",".join("?" * len(ids))
+    with _write_lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DELETE FROM bookmarks WHERE id IN ({marks})", ids)
+            conn.execute(f"DELETE FROM bookmark_rtree WHERE id IN ({marks})", ids)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def delete_bookmark(conn, bookmark_id):
+    delete_bookmarks(conn, [bookmark_id])
+
+
+# id 순서를 유지해서 돌려줌 (지워진 id는 빠짐)
+def get_bookmarks(conn, ids):
+    ids = list(ids)
+    found = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT * FROM bookmarks WHERE id IN ({marks})", chunk):
+            found[row["id"]] = _as_dict(row)
+    return [found[i] for i in ids if i in found]
+
+
+def count_bookmarks(conn):
+    return conn.execute("SELECT count(*) FROM bookmarks").fetchone()[0]
+
+
+# 전체 북마크를 id 순으로 batch개씩 (내보내기용, 메모리에 전부 올리지 않음)
+def iter_all(conn, batch=5000):
+    last_id = 0
+    while True:
+        rows = conn.execute("SELECT * FROM bookmarks WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch)).fetchall()
+        if not rows:
+            return
+        yield [_as_dict(row) for row in rows]
+        last_id = rows[-1]["id"]
+
+
+# 최근 추가 순 목록 한 페이지
+def list_page(conn, page, page_size=20):
+    rows = conn.execute("SELECT * FROM bookmarks ORDER BY id DESC LIMIT ? OFFSET ?", (page_size, page * page_size))
+    return [_as_dict(row) for row in rows]
+
+
+# R-tree로 사각형 범위 검색 (남, 서, 북, 동)
+def within_box(conn, south, west, north, east, limit=None):
+    sql = """SELECT b.* FROM bookmark_rtree r JOIN bookmarks b ON b.id = r.id
+             WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?"""
+    params = [south, north, west, east]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [_as_dict(row) for row in conn.execute(sql, params)]
+
+
+def count_in_box(conn, south, west, north, east):
+    return conn.execute(
+        "SELECT count(*) FROM bookmark_rtree WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?",
+        (south, north, west, east)).fetchone()[0]
+
+
+# 범위 안 북마크를 cell(도) 크기 격자로 묶어 SQL에서 바로 집계
+# → [(평균 위도, 평균 경도, 개수, 대표 id)]
+def clusters_in_box(conn, south, west, north, east, cell):
+    rows = conn.execute("""
+        SELECT avg(b.lat), avg(b.lon), count(*), min(b.id)
+        FROM bookmark_rtree r JOIN bookmarks b ON b.id = r.id
+        WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+        GROUP BY CAST((b.lat + 90) / ? AS INTEGER), CAST((b.lon + 180) / ? AS INTEGER)""",
+        (south, north, west, east, cell, cell))
+    return [tuple(row) for row in rows]
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# 반경 km 안의 북마크를 가까운 순으로 (R-tree 사각형으로 먼저 거르고 실제 거리로 확인)
+def within_radius(conn, lat, lon, km):
+    dlat = math.degrees(km / EARTH_KM)
+    coslat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, dlat / coslat)
+    found = []
+    for bm in within_box(conn, lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+        d = distance_km(lat, lon, bm["lat"], bm["lon"])
+        if d <= km:
+            found.append({**bm, "distance_km": d})
+    found.sort(key=lambda bm: bm["distance_km"])
+    return found
+
+
+# 가장 가까운 n개: 검색 반경을 두 배씩 넓혀 가며 R-tree 검색
+def nearest(conn, lat, lon, n=5, start_km=1.0):
+    total = count_bookmarks(conn)
+    km = start_km
+    while True:
+        found = within_radius(conn, lat, lon, km)
+        if len(found) >= min(n, total) or km > math.pi * EARTH_KM:
+            return found[:n]
+        km *= 2
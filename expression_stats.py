@@ -0,0 +1,111 @@
+# expression_stats.py - 발현 행렬(probe × sample) 분석: PCA, 차등 발현
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.utils.extmath import randomized_svd, svd_flip
+
+from telemetry import timed
+
+
+# PCA 학습. values는 probe × sample 행렬 (df.to_numpy())
+# solver="randomized"는 probe 수만 개 × sample 수백 개 행렬에서 필요한 주성분만 근사 계산
+@timed("expression.fit_pca")
+def fit_pca(values, n_components=2, solver="auto", random_state=0):
+    X = np.asarray(values, dtype=np.float64).T
+    mean = X.mean(axis=0)
+    Xc = X - mean
+    if solver == "auto":
+        solver = "randomized" if min(Xc.shape) > 200 else "full"
+
+    if solver == "randomized":
+        U, S, Vt = randomized_svd(Xc, n_components, n_oversamples=10, random_state=random_state)
+    else:
+        U, S, Vt = np.linalg.svd(Xc, full_matrices=False)
+    # 부호를 고정해야 다시 학습해도 그림 방향이 뒤집히지 않음
+    U, Vt = svd_flip(U, Vt)
+    U, S, Vt = U[:, :n_components], S[:n_components], Vt[:n_components]
+
+    total_var = (Xc ** 2).sum() / max(X.shape[0] - 1, 1)
+    explained = S ** 2 / max(X.shape[0] - 1, 1)
+    return {
+        "mean": mean,
+        "components": Vt,
+        "explained_variance_ratio": explained / total_var if total_var > 0 else explained * 0,
+        "coords": U * S,
+        "solver": solver,
+    }
+
+
+# 이미 학습한 축에 새 샘플 투영 (재학습 없음). new_values는 probe × 새 sample
+def project_samples(model, new_values):
+    X = np.asarray(new_values, dtype=np.float64).T
+    return (X - model["mean"]) @ model["components"].T
+
+
+# 데이터셋 저장소 폴더에 학습 결과를 npz로 남겨 프로세스가 새로 떠도 재사용
+def load_or_fit_pca(values, cache_path=None, n_components=2, solver="auto"):
+    if cache_path and os.path.exists(cache_path):
+        with np.load(cache_path) as saved:
+            model = {key: saved[key] for key in saved.files}
+        model["solver"] = str(model["solver"])
+        return model
+
+    model = fit_pca(values, n_components, solver)
+    if cache_path:
+        tmp = cache_path + ".tmp.npz"
+        np.savez(tmp, **model)
+        os.replace(tmp, cache_path)
+    return model
+
+
+# Benjamini–Hochberg FDR (정렬 한 번 + 누적 최소값으로 전체 probe 동시 계산)
+def bh_fdr(pvalues):
+    p = np.asarray(pvalues, dtype=np.float64)
+    n = p.size
+    order = np.argsort(p)
+    ranked = p[order] * n / np.arange(1, n + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    fdr = np.empty(n)
+    fdr[order] = np.minimum(ranked, 1.0)
+    return fdr
+
+
+# 두 조건 간 차등 발현: log2 fold change, Welch t-test, p-value, BH FDR
+# 모든 probe를 행 단위 NumPy 연산 한 번으로 계산 (유전자별 반복 없음)
+# is_log=None이면 값 범위로 판단 (최댓값이 100을 넘으면 선형 값으로 보고 log2(x+1) 변환)
+@timed("expression.differential_expression")
+def differential_expression(values, labels, group_a, group_b, index=None, is_log=None):
+    X = np.asarray(values, dtype=np.float64)
+    if is_log is None:
+        is_log = np.nanmax(X) <= 100
+    if not is_log:
+        X = np.log2(np.clip(X, 0, None) + 1)
+
+    labels = np.asarray(labels)
+    a = X[:, labels == group_a]
+    b = X[:, labels == group_b]
+    na, nb = a.shape[1], b.shape[1]
+    if na < 2 or nb < 2:
+        raise ValueError("각 조건에 샘플이 2개 이상 있어야 합니다.")
+
+    mean_a, mean_b = a.mean(axis=1), b.mean(axis=1)
+    se_a, se_b = a.var(axis=1, ddof=1) / na, b.var(axis=1, ddof=1) / nb
+    se = np.sqrt(se_a + se_b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(se > 0, (mean_b - mean_a) / se, 0.0)
+        # Welch–Satterthwaite 자유도
+        dof = (se_a + se_b) ** 2 / (se_a ** 2 / (na - 1) + se_b ** 2 / (nb - 1))
+    dof = np.where(np.isfinite(dof), dof, na + nb - 2)
+    p = 2 * stats.t.sf(np.abs(t), dof)
+
+    return pd.DataFrame({
+        "log2FC": mean_b - mean_a,
+        f"mean_{group_a}": mean_a,
+        f"mean_{group_b}": mean_b,
+        "t": t,
+        "p_value": p,
+        "FDR": bh_fdr(p),
+    }, index=index).sort_values("p_value", kind="stable")
@@ -0,0 +1,74 @@
+# figure_cache.py - PNG로 인코딩된 matplotlib 그림을 프로세스 전체에서 재사용하는 LRU 캐시
+
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+from telemetry import span
+
+# 캐시 전체 크기 상한 (PNG 바이트 기준)
+MAX_BYTES = 64 * 1024 * 1024
+
+_cache = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _get(key):
+    with _lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+            stats["hits"] += 1
+        return png
+
+
+def _put(key, png):
+    global _size
+    with _lock:
+        if key in _cache:
+            _size -= len(_cache.pop(key))
+        _cache[key] = png
+        _size += len(png)
+        # 오래 안 쓴 그림부터 제거
+        while _size > MAX_BYTES and len(_cache) > 1:
+            _, old = _cache.popitem(last=False)
+            _size -= len(old)
+            stats["evictions"] += 1
+
+
+# key = (데이터셋 해시, 그림 종류, 매개변수...). 캐시에 없을 때만 draw()로 그림을 그림
+# draw()는 matplotlib Figure를 돌려주고, 인코딩 후 바로 닫아 메모리를 반환
+def render_png(key, draw, **savefig_kwargs):
+    png = _get(key)
+    if png is not None:
+        return png
+
+    with _lock:
+        stats["misses"] += 1
+    with span("figure.draw"):
+        fig = draw()
+    try:
+        buf = io.BytesIO()
+        with span("figure.savefig"):
+            fig.savefig(buf, format="png", bbox_inches="tight", **savefig_kwargs)
+    finally:
+        plt.close(fig)
+    png = buf.getvalue()
+    _put(key, png)
+    return png
+
+
+def cache_info():
+    with _lock:
+        return {"entries": len(_cache), "bytes": _size, **stats}
+
+
+def clear():
+    global _size
+    with _lock:
+        _cache.clear()
+        _size = 0
@@ -1,9 +1,25 @@
 import streamlit as st
 import random
 import time
+import uuid
+import pandas as pd
+from leaderboard import open_leaderboard, player_stats, rank_of, reaction_stats, submit_score, top_scores
+from mole_widget import accepted_hits, mole_game, new_round
+from reaction_sketch import histogram
+from telemetry import span
 
 st.set_page_config(page_title="🐹 두더지 타임 어택", layout="wide")
 
+# 모든 플레이어가 함께 쓰는 리더보드 (프로세스당 한 번만 열기)
+@st.cache_resource
+def get_leaderboard():
+    return open_leaderboard()
+
+board = get_leaderboard()
+
+MOLE_MS = 900  # 두더지가 한 자리에 머무는 시간(ms)
+HOLES = 5
+
 # 제목 및 설명
 st.title("🐹 두더지 타임 어택!")
 st.markdown("🧠 **두더지를 빠르게 클릭해 점수를 얻고, 리더보드에 이름을 올려보세요!**")
@@ -18,20 +34,49 @@ if "score" not in st.session_state:
     st.session_state.game_over = False
     st.session_state.nickname = ""
     st.session_state.playing = False
-    st.session_state.leaderboard = []
+    st.session_state.game_id = None
+    st.session_state.mode = "실시간"
+    st.session_state.misses = 0
+    st.session_state.shown_at = None
+    st.session_state.mole_round = None
 
 # 닉네임 입력
 if not st.session_state.playing:
     st.session_state.nickname = st.text_input("🎮 닉네임을 입력하세요", "Player")
+    st.session_state.mode = st.radio(
+        "🎛️ 게임 방식", ["실시간", "클래식"], horizontal=True,
+        help="실시간: 브라우저에서 바로 진행되고 실제 반응 속도를 잽니다. 클래식: 누를 때마다 화면을 새로 그립니다.",
+    )
     if st.button("🚀 게임 시작하기"):
         st.session_state.score = 0
         st.session_state.hits = []
+        st.session_state.misses = 0
         st.session_state.start_time = time.time()
+        st.session_state.shown_at = None
+        st.session_state.game_id = uuid.uuid4().hex
+        st.session_state.mole_round = new_round(st.session_state.duration, HOLES, MOLE_MS)
         st.session_state.game_over = False
         st.session_state.playing = True
 
-# 게임 중
-if st.session_state.playing and not st.session_state.game_over:
+# 게임 중 (실시간): 서버가 정한 두더지 위치 순서를 넘기고,
+# 끝날 때 컴포넌트가 {game_id, hits: [[두더지 번호, 구멍, 반응 시간]], misses}를 돌려줌
+if st.session_state.playing and not st.session_state.game_over and st.session_state.mode == "실시간":
+    mole_round = st.session_state.mole_round
+    result = mole_game(
+        game_id=st.session_state.game_id, duration=mole_round["duration"], holes=mole_round["holes"],
+        mole_ms=mole_round["mole_ms"], targets=mole_round["targets"], key="mole_game", default=None,
+    )
+    # 이전 판의 결과가 남아 있을 수 있으므로 game_id 확인. 점수는 서버가 낸 판과 맞는 기록만 인정
+    if result and result.get("game_id") == st.session_state.game_id:
+        hits = accepted_hits(mole_round, result.get("hits"))
+        st.session_state.hits = hits
+        st.session_state.misses = int(result.get("misses", 0))
+        st.session_state.score = len(hits)
+        st.session_state.game_over = True
+        st.session_state.playing = False
+
+# 게임 중 (클래식)
+if st.session_state.playing and not st.session_state.game_over and st.session_state.mode == "클래식":
     elapsed = time.time() - st.session_state.start_time
     remaining = max(0, int(st.session_state.duration - elapsed))
 
@@ -51,9 +96,11 @@ if st.session_state.playing and not st.session_state.game_over:
         if i == target_index:
             if col.button("🐹"):
                 st.session_state.score += 1
-                st.session_state.hits.append(time.time() - st.session_state.start_time)
+                # 반응 시간 = 직전 화면에 두더지가 나타난 뒤 누를 때까지
+                st.session_state.hits.append(time.time() - (st.session_state.shown_at or st.session_state.start_time))
         else:
             col.markdown(" ")
+    st.session_state.shown_at = time.time()
 
 # 게임 종료 화면
 if st.session_state.game_over:
@@ -66,29 +113,59 @@ if st.session_state.game_over:
     )
     st.markdown(f"⚡ 평균 반응 속도: `{avg_reaction:.2f}초`")
 
-    # 리더보드 업데이트
-    st.session_state.leaderboard.append({
-        "nickname": st.session_state.nickname,
-        "score": st.session_state.score,
-        "reaction": avg_reaction
-    })
+    # 리더보드 업데이트 (game_id 기준으로 한 판에 한 번만 기록, 맞힐 때마다의 반응 시간도 함께)
+    with span("game.submit_score"):
+        submit_score(
+            board, st.session_state.game_id, st.session_state.nickname, st.session_state.score, avg_reaction,
+            hits=st.session_state.hits, misses=st.session_state.misses,
+        )
+    st.markdown(f"🏅 전체 순위: `{rank_of(board, st.session_state.score, avg_reaction)}위`")
+
+    # 이번 판 / 내 누적 / 전체 반응 속도 분포
+    if st.session_state.hits:
+        game_p = pd.Series(st.session_state.hits).quantile([0.5, 0.9, 0.99]).tolist()
+        rows = [{"구분": "이번 판", "맞힌 수": len(st.session_state.hits),
+                 "p50": game_p[0], "p90": game_p[1], "p99": game_p[2]}]
+        for label, stats in [("내 누적", reaction_stats(board, st.session_state.nickname)),
+                             ("전체", reaction_stats(board))]:
+            if stats and stats["count"]:
+                rows.append({"구분": label, "맞힌 수": stats["count"],
+                             "p50": stats["p50"], "p90": stats["p90"], "p99": stats["p99"]})
+        st.markdown("#### ⏱️ 반응 속도 분포 (초)")
+        st.dataframe(pd.DataFrame(rows).set_index("구분").round(3), use_container_width=True)
 
     # 리더보드 출력
     st.markdown("---")
     st.markdown("## 🏅 리더보드 (Top 5)")
-    sorted_board = sorted(
-        st.session_state.leaderboard,
-        key=lambda x: (-x["score"], x["reaction"])
-    )
-    for i, record in enumerate(sorted_board[:5], 1):
+    for i, record in enumerate(top_scores(board, 5), 1):
         st.markdown(
             f"**{i}. {record['nickname']}** - 점수: `{record['score']}`, 반응속도: `{record['reaction']:.2f}초`"
         )
 
+    # 반응 속도 통계 (스케치로 누적한 분포라 기록이 많아도 바로 계산됨)
+    with st.expander("📊 반응 속도 통계"):
+        overall = reaction_stats(board)
+        if overall and overall["count"]:
+            st.markdown(
+                f"전체 `{overall['games']}`판, 맞힌 수 `{overall['hits']}`회, "
+                f"명중률 `{(overall['hit_rate'] or 0) * 100:.1f}%`"
+            )
+            values, counts = histogram(overall["sketch"])
+            hist = pd.DataFrame({"반응 속도(초)": values.round(3), "횟수": counts})
+            st.bar_chart(hist.set_index("반응 속도(초)"))
+            st.dataframe(pd.DataFrame([
+                {"닉네임": p["nickname"], "판 수": p["games"], "맞힌 수": p["hits"],
+                 "명중률(%)": (p["hit_rate"] or 0) * 100, "p50": p["p50"], "p90": p["p90"], "p99": p["p99"]}
+                for p in player_stats(board)
+            ]).round(3), use_container_width=True, hide_index=True)
+        else:
+            st.info("아직 기록이 없습니다.")
+
     # 재시작 버튼
     if st.button("🔁 다시하기"):
         st.session_state.playing = False
         st.session_state.game_over = False
         st.session_state.start_time = None
         st.session_state.hits = []
+        st.session_state.misses = 0
         st.session_state.score = 0
@@ -0,0 +1,126 @@
+# gene_index.py - 서버 쪽 유전자 검색 인덱스 (project.py 유전자 선택용)
+# 전체 probe 목록을 브라우저로 보내지 않고, 입력한 검색어에 맞는 N개만 돌려줌
+
+import glob
+import gzip
+import os
+from bisect import bisect_left, bisect_right
+
+import pandas as pd
+
+ANNOTATION_COLUMNS = {
+    "symbol": ["Gene symbol", "Gene Symbol", "GENE_SYMBOL", "Symbol"],
+    "title": ["Gene title", "Gene Title", "GENE_NAME", "Description", "Target Description"],
+}
+
+
+# GEO 플랫폼 주석 파일(GPLxxxx.annot.gz, GPLxxxx-*.txt 등)에서 probe → (유전자 기호, 설명)
+# 로컬에 파일이 없으면 빈 dict
+def load_platform_annotation(platform_id, directory="."):
+    candidates = sorted(glob.glob(os.path.join(directory, f"{platform_id}.annot*"))) + \
+        sorted(glob.glob(os.path.join(directory, f"{platform_id}[-_]*.txt*")))
+    if not platform_id or not candidates:
+        return {}
+    path = candidates[0]
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        # "ID<TAB>..." 헤더 줄까지 주석/메타 줄 건너뛰기
+        for line in f:
+            if line.startswith("ID\t"):
+                header = line.rstrip("\n").split("\t")
+                break
+        else:
+            return {}
+        table = pd.read_csv(f, sep="\t", names=header, comment="!", dtype=str, on_bad_lines="skip")
+
+    def pick(kind):
+        for name in ANNOTATION_COLUMNS[kind]:
+            if name in table.columns:
+                return table[name].fillna("")
+        return pd.Series("", index=table.index)
+
+    symbols, titles = pick("symbol"), pick("title")
+    return {probe: (symbol, title) for probe, symbol, title in zip(table["ID"], symbols, titles)}
+
+
+# probes는 보여줄 순서(예: 차등 발현 순위) 그대로 전달
+def build_gene_index(probes, annotations=None):
+    probes = [str(p) for p in probes]
+    annotations = annotations or {}
+    labels = []
+    prefix_keys = []
+    # 부분 문자열 검색용: 모든 항목을 한 줄씩 이어 붙인 문자열 + 줄 시작 위치
+    lines = []
+    offsets = []
+    pos = 0
+    for i, probe in enumerate(probes):
+        symbol, title = annotations.get(probe, ("", ""))
+        labels.append(f"{probe} · {symbol}" if symbol else probe)
+        prefix_keys.append((probe.lower(), i))
+        if symbol:
+            prefix_keys.append((symbol.lower(), i))
+        line = f"{probe} {symbol} {title}".lower()
+        lines.append(line)
+        offsets.append(pos)
+        pos += len(line) + 1
+    prefix_keys.sort()
+    return {
+        "probes": probes,
+        "labels": dict(zip(probes, labels)),
+        "prefix_keys": [k for k, _ in prefix_keys],
+        "prefix_rows": [i for _, i in prefix_keys],
+        "blob": "\n".join(lines),
+        "offsets": offsets,
+    }
+
+
+def _prefix_matches(index, query):
+    keys = index["prefix_keys"]
+    lo = bisect_left(keys, query)
+    hi = bisect_right(keys, query + "\uffff")
+    return sorted(set(index["prefix_rows"][lo:hi]))
+
+
+def _substring_matches(index, query):
+    blob, offsets = index["blob"], index["offsets"]
+    pos = blob.find(query)
+    last = -1
+    while pos != -1:
+        row = bisect_right(offsets, pos) - 1
+        if row != last:
+            yield row
+            last = row
+        # 같은 줄의 나머지는 건너뛰고 다음 줄부터 다시 찾기
+        next_line = offsets[row + 1] if row + 1 < len(offsets) else len(blob)
+        pos = blob.find(query, next_line)
+
+
+# 검색 결과 한 페이지: (probe 목록, 다음 페이지 존재 여부)
+# 접두어 일치(probe ID, 유전자 기호)를 먼저, 그다음 부분 문자열 일치를 원래 순서대로
+def search_genes(index, query, offset=0, limit=20):
+    query = query.strip().lower()
+    probes = index["probes"]
+    if not query:
+        return probes[offset:offset + limit], offset + limit < len(probes)
+
+    seen = set()
+    results = []
+    wanted = offset + limit + 1
+
+    def collect(rows):
+        for row in rows:
+            if row not in seen:
+                seen.add(row)
+                results.append(row)
+                if len(results) >= wanted:
+                    return True
+        return False
+
+    if not collect(_prefix_matches(index, query)):
+        collect(_substring_matches(index, query))
+    page = [probes[row] for row in results[offset:offset + limit]]
+    return page, len(results) > offset + limit
+
+
+def gene_label(index, probe):
+    return index["labels"].get(probe, probe)
@@ -0,0 +1,191 @@
+# geo_data.py - GEO series matrix 로컬 저장소 (project.py에서 사용)
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from telemetry import timed
+
+CACHE_DIR = os.path.join(".cache", "geo")
+ACCESSION_PATTERN = re.compile(r"GSE\d+")
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024  # 내려받기 한도 (이보다 크면 중단)
+
+
+# URL과 파일 경로에 그대로 들어가므로 "GSE숫자" 형식만 허용
+def is_accession(accession):
+    return ACCESSION_PATTERN.fullmatch(accession) is not None
+
+
+def _check_accession(accession):
+    if not is_accession(accession):
+        raise ValueError(f"GEO 시리즈 번호 형식이 아닙니다: {accession!r}")
+
+
+# GSE17669 → https://ftp.ncbi.nlm.nih.gov/geo/series/GSE17nnn/GSE17669/matrix/GSE17669_series_matrix.txt.gz
+def series_url(accession):
+    _check_accession(accession)
+    prefix = accession[:-3] + "nnn" if len(accession) > 6 else "GSEnnn"
+    return f"https://ftp.ncbi.nlm.nih.gov/geo/series/{prefix}/{accession}/matrix/{accession}_series_matrix.txt.gz"
+
+
+def series_path(accession, directory="."):
+    _check_accession(accession)
+    return os.path.join(directory, f"{accession}_series_matrix.txt.gz")
+
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+# "!Sample_title" 같은 헤더 줄을 읽어 샘플 메타데이터로 정리하고,
+# "!series_matrix_table_begin" 위치에서 발현 표를 읽음 (skiprows 하드코딩 없이)
+@timed("geo.parse_series_matrix")
+def parse_series_matrix(path):
+    series = {}
+    samples = {}
+    with _open_text(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("!series_matrix_table_begin"):
+                break
+            if not line.startswith("!"):
+                continue
+            key, _, rest = line.partition("\t")
+            values = [v.strip('"') for v in rest.split("\t")] if rest else []
+            if key.startswith("!Sample_"):
+                name = key[len("!Sample_"):]
+                # characteristics_ch1 처럼 여러 줄 반복되는 항목은 번호를 붙여 구분
+                base, n = name, 1
+                while name in samples:
+                    n += 1
+                    name = f"{base}_{n}"
+                samples[name] = values
+            elif key.startswith("!Series_"):
+                series.setdefault(key[len("!Series_"):], []).append(" ".join(values))
+        df = pd.read_csv(f, sep="\t", comment="!", index_col=0)
+
+    df.index = df.index.astype(str)
+    df = df.apply(pd.to_numeric, errors="coerce").astype(np.float32)
+    df.dropna(inplace=True)
+    return df, {"series": series, "samples": samples}
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# 원본 파일 → float32 행렬(.npy) + 프로브 ID(.npy) + 메타데이터(.json)
+def build_store(path, cache_dir=CACHE_DIR):
+    digest = _file_hash(path)
+    name = os.path.basename(path).split("_")[0]
+    store = os.path.join(cache_dir, f"{name}-{digest[:12]}")
+    if os.path.exists(os.path.join(store, "meta.json")):
+        return store
+
+    df, meta = parse_series_matrix(path)
+    tmp = store + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "expression.npy"), df.to_numpy(np.float32))
+    np.save(os.path.join(tmp, "probes.npy"), df.index.to_numpy(dtype=str))
+    meta.update(source=os.path.basename(path), sha1=digest, columns=df.columns.tolist())
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    if os.path.exists(store):
+        shutil.rmtree(store)
+    os.replace(tmp, store)
+    return store
+
+
+def _store_for(path, cache_dir):
+    # mtime/크기가 그대로면 해시 계산 없이 이전 저장소 재사용
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, "index.json")
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    key = os.path.abspath(path)
+    entry = index.get(key)
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size \
+            and os.path.exists(os.path.join(entry["store"], "meta.json")):
+        return entry["store"]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    store = build_store(path, cache_dir)
+    index[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "store": store}
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(index_path + ".tmp", index_path)
+    return store
+
+
+# 받다가 끊기거나 한도를 넘으면 깨진 파일이 남지 않도록 임시 파일로 받은 뒤 이름 변경
+def _download(url, path, max_bytes=MAX_DOWNLOAD_BYTES):
+    size = 0
+    try:
+        with urllib.request.urlopen(url) as response, open(path + ".part", "wb") as f:
+            if int(response.headers.get("Content-Length") or 0) > max_bytes:
+                raise ValueError(f"파일이 너무 큽니다 (한도 {max_bytes // (1024 * 1024)}MB)")
+            for block in iter(lambda: response.read(1 << 20), b""):
+                size += len(block)
+                if size > max_bytes:
+                    raise ValueError(f"파일이 너무 큽니다 (한도 {max_bytes // (1024 * 1024)}MB)")
+                f.write(block)
+        os.replace(path + ".part", path)
+    except BaseException:
+        if os.path.exists(path + ".part"):
+            os.remove(path + ".part")
+        raise
+
+
+# 발현 행렬(DataFrame, probe × sample)과 메타데이터 불러오기
+# 로컬 파일이 없으면 offline=False일 때만 GEO에서 내려받음 (MAX_DOWNLOAD_BYTES까지)
+# 발현 값은 memory-map 그대로 DataFrame에 넣음 (복사하지 않음, 읽기 전용)
+@timed("geo.load_series")
+def load_series(accession, directory=".", cache_dir=CACHE_DIR, offline=False):
+    path = series_path(accession, directory)
+    if not os.path.exists(path):
+        if offline:
+            raise FileNotFoundError(path)
+        _download(series_url(accession), path)
+
+    store = _store_for(path, cache_dir)
+    with open(os.path.join(store, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["store"] = store
+    values = np.load(os.path.join(store, "expression.npy"), mmap_mode="r")
+    probes = np.load(os.path.join(store, "probes.npy"))
+    df = pd.DataFrame(values, index=pd.Index(probes, name="ID_REF"), columns=meta["columns"], copy=False)
+    return df, meta
+
+
+# 샘플 조건 라벨: 알려진 데이터셋은 고정값, 나머지는 !Sample_source_name_ch1 사용
+KNOWN_CONDITIONS = {
+    "GSE17669": ["Normal"] * 12 + ["Drought"] * 12,
+}
+
+
+def sample_conditions(accession, meta):
+    n = len(meta["columns"])
+    known = KNOWN_CONDITIONS.get(accession)
+    if known and len(known) == n:
+        return known
+    for key in ["source_name_ch1", "characteristics_ch1", "title"]:
+        values = meta["samples"].get(key)
+        if values and len(values) == n:
+            return values
+    return ["Sample"] * n
@@ -0,0 +1,159 @@
+# leaderboard.py - 모든 플레이어가 함께 쓰는 리더보드 (game.py에서 사용)
+# SQLite에 영구 저장하고, 화면에 자주 보여 주는 상위 기록은 메모리에 정렬된 상태로 유지
+# 두더지를 맞힐 때마다의 반응 시간은 hits 표에 남기고, 분포는 플레이어별/전체 스케치로 누적
+
+import sqlite3
+import threading
+import time
+from bisect import insort
+
+from reaction_sketch import add, from_json, new_sketch, summary, to_json
+
+DB_PATH = "leaderboard.db"
+TOP_CACHE = 100  # 메모리에 들고 있는 상위 기록 수
+RELOAD_SECONDS = 10  # 다른 프로세스가 쓴 기록을 반영하기 위해 상위 기록을 다시 읽는 간격
+GLOBAL_SCOPE = "global"  # reaction_stats 표에서 전체 플레이어 합계 행 (플레이어 행은 "player:닉네임")
+
+
+def open_leaderboard(path=DB_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS games (
+            game_id TEXT PRIMARY KEY,
+            nickname TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            reaction REAL NOT NULL,
+            played_at REAL NOT NULL
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS games_rank ON games (score DESC, reaction ASC)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS hits (
+            game_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            nickname TEXT NOT NULL,
+            reaction REAL NOT NULL,
+            PRIMARY KEY (game_id, seq)
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reaction_stats (
+            scope TEXT PRIMARY KEY,
+            sketch TEXT NOT NULL,
+            games INTEGER NOT NULL,
+            hits INTEGER NOT NULL,
+            misses INTEGER NOT NULL
+        )""")
+    board = {"conn": conn, "lock": threading.Lock(), "top": []}
+    _reload_top(board)
+    return board
+
+
+# 정렬 키: 점수 높은 순 → 반응 속도 빠른 순 → 먼저 기록한 순
+def _rank_key(score, reaction, played_at):
+    return (-score, reaction, played_at)
+
+
+def _reload_top(board):
+    rows = board["conn"].execute(
+        "SELECT nickname, score, reaction, played_at FROM games ORDER BY score DESC, reaction ASC, played_at ASC LIMIT ?",
+        (TOP_CACHE,))
+    board["top"] = [(_rank_key(score, reaction, played_at), nickname) for nickname, score, reaction, played_at in rows]
+    board["loaded_at"] = time.time()
+
+
+def _player_scope(nickname):
+    return "player:" + nickname
+
+
+def _update_stats(conn, scope, hits, misses):
+    row = conn.execute("SELECT sketch, games, hits, misses FROM reaction_stats WHERE scope = ?", (scope,)).fetchone()
+    sketch, games, total_hits, total_misses = (from_json(row[0]), *row[1:]) if row else (new_sketch(), 0, 0, 0)
+    add(sketch, hits)
+    conn.execute(
+        "INSERT OR REPLACE INTO reaction_stats (scope, sketch, games, hits, misses) VALUES (?, ?, ?, ?, ?)",
+        (scope, to_json(sketch), games + 1, total_hits + len(hits), total_misses + misses))
+
+
+# 게임 한 판 기록. game_id가 같으면 다시 불려도 한 번만 저장 → 저장했으면 True
+# hits: 맞힌 순서대로의 반응 시간(초), misses: 빈 칸을 누른 횟수
+def submit_score(board, game_id, nickname, score, reaction, hits=(), misses=0):
+    played_at = time.time()
+    hits = [float(r) for r in hits]
+    with board["lock"]:
+        conn = board["conn"]
+        # 다른 프로세스와 스케치를 동시에 고치지 않도록 쓰기 잠금을 먼저 잡음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO games (game_id, nickname, score, reaction, played_at) VALUES (?, ?, ?, ?, ?)",
+                (game_id, nickname, int(score), float(reaction), played_at))
+            if cur.rowcount == 0:
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany(
+                "INSERT INTO hits (game_id, seq, nickname, reaction) VALUES (?, ?, ?, ?)",
+                [(game_id, seq, nickname, r) for seq, r in enumerate(hits)])
+            for scope in (GLOBAL_SCOPE, _player_scope(nickname)):
+                _update_stats(conn, scope, hits, int(misses))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        key = _rank_key(int(score), float(reaction), played_at)
+        top = board["top"]
+        if len(top) < TOP_CACHE or key < top[-1][0]:
+            insort(top, (key, nickname))
+            del top[TOP_CACHE:]
+        return True
+
+
+# 상위 k개 기록 (메모리 캐시에서 바로, 캐시보다 많이 요청하면 DB 조회)
+def top_scores(board, k=5):
+    with board["lock"]:
+        if k <= TOP_CACHE:
+            if time.time() - board["loaded_at"] > RELOAD_SECONDS:
+                _reload_top(board)
+            entries = board["top"][:k]
+            return [{"nickname": nickname, "score": -key[0], "reaction": key[1]} for key, nickname in entries]
+        rows = board["conn"].execute(
+            "SELECT nickname, score, reaction FROM games ORDER BY score DESC, reaction ASC, played_at ASC LIMIT ?",
+            (k,)).fetchall()
+    return [{"nickname": nickname, "score": score, "reaction": reaction} for nickname, score, reaction in rows]
+
+
+# 이 기록보다 앞선 기록 수 + 1 (인덱스 범위 조회)
+def rank_of(board, score, reaction):
+    with board["lock"]:
+        ahead = board["conn"].execute(
+            "SELECT count(*) FROM games WHERE score > ? OR (score = ? AND reaction < ?)",
+            (score, score, reaction)).fetchone()[0]
+    return ahead + 1
+
+
+def _stats_row(scope, sketch, games, hits, misses):
+    sketch = from_json(sketch)
+    return {
+        "nickname": scope.split(":", 1)[1] if scope.startswith("player:") else None,
+        "sketch": sketch, "games": games, "hits": hits, "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else None,
+        **summary(sketch),
+    }
+
+
+# 한 플레이어(nickname=None이면 전체)의 반응 속도 분포 → count, mean, p50, p90, p99, hit_rate, sketch ...
+def reaction_stats(board, nickname=None):
+    scope = GLOBAL_SCOPE if nickname is None else _player_scope(nickname)
+    with board["lock"]:
+        row = board["conn"].execute(
+            "SELECT scope, sketch, games, hits, misses FROM reaction_stats WHERE scope = ?", (scope,)).fetchone()
+    return _stats_row(*row) if row else None
+
+
+# 맞힌 횟수가 많은 플레이어 순 통계 목록
+def player_stats(board, limit=20):
+    with board["lock"]:
+        rows = board["conn"].execute(
+            "SELECT scope, sketch, games, hits, misses FROM reaction_stats WHERE scope LIKE 'player:%' ORDER BY hits DESC LIMIT ?",
+            (limit,)).fetchall()
+    return [_stats_row(*row) for row in rows]
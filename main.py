@@ -0,0 +1,54 @@
+# main.py - 모든 앱을 하나의 서버에서 여는 통합 실행 파일
+# 사용: streamlit run main.py
+#   - 각 앱 스크립트는 처음 열 때만 실행되고, 무거운 라이브러리는 한 번만 불러와 모든 앱이 같이 씀
+#   - st.cache_data / st.cache_resource 캐시도 프로세스 하나에서 공유됨
+#   - 서버가 뜨면 warmup.py가 백그라운드에서 라이브러리와 데이터 캐시를 미리 준비
+#   - APP_TELEMETRY=1 이면 페이지 실행마다 걸린 시간을 기록 (숨은 페이지 /admin 에서 확인)
+
+import streamlit as st
+from telemetry import span
+from warmup import PAGE_MODULES, import_profile, start_preload
+
+APPS = [
+    ("app.py", "북마크 지도", "📍"),
+    ("population.py", "지역별 인구 분석", "📊"),
+    ("project.py", "보리 유전자 발현 분석", "🧬"),
+    ("game.py", "두더지 타임 어택", "🐹"),
+    ("rpg.py", "아르카디아 연대기", "🎮"),
+    ("test1.py", "가위바위보", "✊"),
+]
+
+
+# 프로세스당 한 번만 (세션마다 다시 실행되지 않도록)
+@st.cache_resource
+def warm_start():
+    start_preload()
+    return True
+
+
+def home():
+    st.title("🏠 앱 모음")
+    for path, title, icon in APPS:
+        st.page_link(path, label=title, icon=icon)
+
+    # 이 서버 프로세스에서 잰 모듈별 import 시간
+    with st.expander("⏱️ 라이브러리 불러오기 시간"):
+        profile = import_profile()
+        if profile:
+            st.dataframe(
+                [{"모듈": name, "초": "미설치" if seconds is None else round(seconds, 3),
+                  "사용하는 앱": ", ".join(page for page, modules in PAGE_MODULES.items() if name in modules)}
+                 for name, seconds in profile],
+                use_container_width=True, hide_index=True,
+            )
+        else:
+            st.info("아직 미리 불러오는 중입니다.")
+
+
+warm_start()
+pages = [st.Page(home, title="홈", icon="🏠", default=True)]
+pages += [st.Page(path, title=title, icon=icon) for path, title, icon in APPS]
+pages.append(st.Page("admin.py", title="측정", icon="🛠️", url_path="admin", visibility="hidden"))
+current = st.navigation(pages)
+with span(f"rerun.{current.url_path or 'home'}"):
+    current.run()
@@ -0,0 +1,53 @@
+# mole_widget.py - 두더지 게임 브라우저 컴포넌트 선언 (game.py에서 사용)
+# declare_component는 실제 모듈 안에서 불러야 해서 (main.py로 여는 페이지 스크립트는 모듈이 아님) 따로 둠
+
+import os
+import random
+
+import streamlit.components.v1 as components
+
+MIN_REACTION = 0.1    # 이보다 빠른 반응은 사람이 낼 수 없는 값으로 보고 버림
+TIMING_SLACK = 0.25   # 브라우저 프레임 단위 오차 허용(초)
+
+# 브라우저 안에서 도는 게임 화면 (mole_component/index.html)
+# 타이머/두더지 이동/반응 속도 측정은 클라이언트에서 하고, 한 판이 끝나면 결과만 한 번 보냄
+mole_game = components.declare_component(
+    "mole_game", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "mole_component")
+)
+
+
+# 한 판의 두더지 위치 순서를 서버에서 정함 (브라우저는 이 순서대로만 두더지를 띄움)
+# 두더지는 한 번에 하나씩 나오고 맞히려면 MIN_REACTION 이상 걸리므로 한 판에 나올 수 있는 최대 수만큼 만듦
+def new_round(duration, holes, mole_ms, rng=random):
+    targets = []
+    for _ in range(int(duration / MIN_REACTION) + 1):
+        hole = rng.randrange(holes)
+        if holes > 1 and targets and hole == targets[-1]:
+            hole = (hole + 1) % holes
+        targets.append(hole)
+    return {"duration": duration, "holes": holes, "mole_ms": mole_ms, "targets": targets}
+
+
+# 브라우저가 보낸 [[두더지 번호, 구멍, 반응 시간], ...] 중 서버가 낸 판과 맞는 것만 반응 시간 목록으로
+#   - 두더지 번호는 앞으로만 가고, 구멍은 서버가 정한 위치와 같아야 함
+#   - 반응 시간은 MIN_REACTION 이상, 두더지가 머무는 시간 이하
+#   - 놓친 두더지는 mole_ms씩, 맞힌 두더지는 반응 시간만큼 흐른 시간의 합이 게임 시간을 넘으면 그 뒤는 버림
+def accepted_hits(round_, hits):
+    targets = round_["targets"]
+    mole_seconds = round_["mole_ms"] / 1000
+    elapsed, last, accepted = 0.0, -1, []
+    for item in hits if isinstance(hits, list) else []:
+        try:
+            mole, hole, reaction = int(item[0]), int(item[1]), float(item[2])
+        except (TypeError, ValueError, IndexError, KeyError):
+            continue
+        if not last < mole < len(targets) or hole != targets[mole]:
+            continue
+        if not MIN_REACTION <= reaction <= mole_seconds + TIMING_SLACK:
+            continue
+        elapsed += (mole - last - 1) * mole_seconds + reaction
+        if elapsed > round_["duration"] + TIMING_SLACK:
+            break
+        accepted.append(reaction)
+        last = mole
+    return accepted
@@ -1,56 +1,156 @@
 import streamlit as st
 import pandas as pd
+import glob
+import os
 import plotly.graph_objects as go
+from population_data import (
+    REGION_COLUMN, age_bands, age_matrix, age_summary, build_region_index, cached_columns, find_region,
+    ingest_history, load_history, load_table, region_children, source_key
+)
+from telemetry import span
 
 # 페이지 설정
-st.set_page_config(page_title="서울시 인구 분석", layout="wide")
-st.title("📊 서울시 연령별 인구 시각화")
+st.set_page_config(page_title="지역별 인구 분석", layout="wide")
+st.title("📊 지역별 연령별 인구 시각화")
 
 # 파일 경로 (같은 디렉토리에 있어야 함)
 TOTAL_PATH = "합계.csv"
 GENDER_PATH = "남녀구분.csv"
+MONTHLY_DIR = "월별"  # 지난 달 CSV들을 모아 두는 폴더 (선택)
+ALL = "전체"
 
-try:
-    # 파일 읽기
-    df_total = pd.read_csv(TOTAL_PATH, encoding='cp949')
-    df_gender = pd.read_csv(GENDER_PATH, encoding='cp949')
+# 행정구역 계층 인덱스 (파일이 바뀔 때만 다시 구성). 읽기 전용이라 rerun마다 복사하지 않고 그대로 공유
+@st.cache_resource
+def region_index(path, key):
+    return build_region_index(load_table(path, columns=[REGION_COLUMN])[REGION_COLUMN])
+
+# 월별 누적 저장소 갱신은 원본 파일이 바뀌었을 때만 (키 = 파일별 source_key). 화면을 그릴 때마다 하지 않음
+@st.cache_resource
+def history_store(sources):
+    ingest_history([path for path, _ in sources])
+    return True
 
-    # 서울시 전체만 추출
-    df_total_seoul = df_total[df_total['행정구역'].str.contains("서울특별시") & ~df_total['행정구역'].str.contains("구")]
-    df_gender_seoul = df_gender[df_gender['행정구역'].str.contains("서울특별시") & ~df_gender['행정구역'].str.contains("구")]
+# 전체 지역의 요약 통계와 5세 구간 행렬 (지역 × 연령 행렬 한 번으로 계산)
+@st.cache_data
+def region_stats(path, key):
+    columns = [col for col in cached_columns(path) if '계_' in col and '세' in col]
+    df = load_table(path, columns=[REGION_COLUMN] + columns)
+    matrix, ages = age_matrix(df, columns)
+    bands, band_labels = age_bands(matrix, ages)
+    return age_summary(matrix, ages), pd.DataFrame(bands, columns=band_labels)
 
-    # 연령별 컬럼 추출
-    age_columns = [col for col in df_total_seoul.columns if '계_' in col and '세' in col]
+try:
+    # 필요한 컬럼만 선택 (숫자 컬럼은 캐시 생성 시 이미 정수로 변환됨)
+    age_columns = [col for col in cached_columns(TOTAL_PATH) if '계_' in col and '세' in col]
     age_labels = [col.split('_')[-1] for col in age_columns]
 
-    # 남녀 각각 컬럼
-    male_columns = [col for col in df_gender_seoul.columns if '남_' in col and '세' in col]
-    female_columns = [col for col in df_gender_seoul.columns if '여_' in col and '세' in col]
-    age_labels_gender = [col.split('_')[-1] for col in male_columns]
-
-    # 문자열 → 숫자 처리 함수
-    def clean(series):
-        return pd.to_numeric(series.fillna('0').astype(str).str.replace(',', ''), errors='coerce').fillna(0).astype(int)
-
-    # 각 시리즈 정리
-    total_counts = clean(df_total_seoul[age_columns].iloc[0])
-    male_counts = clean(df_gender_seoul[male_columns].iloc[0])
-    female_counts = clean(df_gender_seoul[female_columns].iloc[0])
-
-    # 전체 인구 분포 시각화
-    fig1 = go.Figure()
-    fig1.add_trace(go.Bar(x=age_labels, y=total_counts, name='전체 인구', marker_color='indigo'))
-    fig1.update_layout(title="서울시 전체 인구의 연령별 분포", xaxis_title="연령", yaxis_title="인구 수")
-
-    # 남녀 인구 분포 시각화
-    fig2 = go.Figure()
-    fig2.add_trace(go.Bar(x=age_labels_gender, y=male_counts, name='남성', marker_color='blue'))
-    fig2.add_trace(go.Bar(x=age_labels_gender, y=female_counts, name='여성', marker_color='pink'))
-    fig2.update_layout(title="서울시 남성과 여성 인구의 연령별 비교", xaxis_title="연령", yaxis_title="인구 수", barmode='group')
-
-    # 출력
-    st.plotly_chart(fig1, use_container_width=True)
-    st.plotly_chart(fig2, use_container_width=True)
+    mode = st.radio("보기 방식", ["단일 지역", "하위 지역 비교", "월별 추이"], horizontal=True)
+
+    # 지역 선택 (시도 → 시군구 → 구 → 읍면동). 구는 "수원시"처럼 구가 있는 시에서만 고름
+    total_index = region_index(TOTAL_PATH, source_key(TOTAL_PATH))
+    col1, col2, col3, col4 = st.columns(4)
+    sidos = region_children(total_index)
+    sido = col1.selectbox("시도", sidos, index=sidos.index("서울특별시") if "서울특별시" in sidos else 0)
+    path = [sido]
+    sigungus = region_children(total_index, sido)
+    sigungu = col2.selectbox("시군구", [ALL] + sigungus, format_func=lambda x: x or sido)
+    if sigungu != ALL:
+        path.append(sigungu)
+        children = region_children(total_index, *path)
+        first = find_region(total_index, *path, children[0]) if children else None
+        if first and first["level"] == "sigungu":
+            gu = col3.selectbox("구", [ALL] + children)
+            children = []
+            if gu != ALL:
+                path.append(gu)
+                children = region_children(total_index, *path)
+        if children:
+            dong = col4.selectbox("읍면동", [ALL] + children)
+            if dong != ALL:
+                path.append(dong)
+    region = find_region(total_index, *path)
+    if region is None:
+        st.warning(f"'{' '.join(path)}' 지역 정보를 찾을 수 없습니다. 다른 지역을 선택해 주세요.")
+        st.stop()
+    region_name = region["name"]
+
+    if mode == "하위 지역 비교":
+        # 선택한 지역의 하위 지역들을 한 번에 비교
+        summary, bands = region_stats(TOTAL_PATH, source_key(TOTAL_PATH))
+        children = [find_region(total_index, *path, child) for child in region_children(total_index, *path)]
+        children = [child for child in children if child is not None]
+        names = {child["name"]: child["row"] for child in children}
+        picked = st.multiselect("비교할 지역", list(names), default=list(names))
+        if not picked:
+            st.info("비교할 하위 지역이 없습니다. 상위 지역을 선택해 주세요.")
+        else:
+            rows = [names[name] for name in picked]
+            table = summary.iloc[rows].set_axis(picked)
+            st.dataframe(table.style.format(precision=1), use_container_width=True)
+
+            fig3 = go.Figure()
+            fig3.add_trace(go.Bar(x=picked, y=table["중위연령"], name='중위연령', marker_color='indigo'))
+            fig3.update_layout(title=f"{region_name} 하위 지역별 중위연령", xaxis_title="지역", yaxis_title="연령")
+
+            shares = bands.iloc[rows].to_numpy()
+            shares = shares / shares.sum(axis=1, keepdims=True).clip(min=1) * 100
+            fig4 = go.Figure(go.Heatmap(z=shares, x=bands.columns, y=picked, colorscale='Blues', colorbar_title='%'))
+            fig4.update_layout(title=f"{region_name} 하위 지역별 5세 연령 구간 비율", xaxis_title="연령 구간", height=max(400, 22 * len(picked)))
+
+            with span("population.plotly_chart"):
+                st.plotly_chart(fig3, use_container_width=True)
+                st.plotly_chart(fig4, use_container_width=True)
+
+    elif mode == "월별 추이":
+        # 새로 추가된 월별 파일만 chunk 단위로 누적 저장 후, 선택 지역만 읽기
+        sources = [path for path in [TOTAL_PATH, GENDER_PATH] if os.path.exists(path)]
+        sources += sorted(glob.glob(os.path.join(MONTHLY_DIR, "*.csv")))
+        history_store(tuple((path, source_key(path)) for path in sources))
+        history = load_history(codes=[region["code"]], sex="계", columns=["month", "age", "count"])
+        groups = pd.cut(history["age"], [-1, 14, 64, 200], labels=["유소년(0-14)", "생산가능(15-64)", "고령(65+)"])
+        trend = history.groupby(["month", groups], observed=False)["count"].sum().unstack()
+        months = [f"{m // 100}-{m % 100:02d}" for m in trend.index]
+
+        fig5 = go.Figure()
+        for name, color in zip(trend.columns, ['green', 'indigo', 'orange']):
+            fig5.add_trace(go.Bar(x=months, y=trend[name], name=name, marker_color=color))
+        fig5.update_layout(title=f"{region_name} 월별 연령대 인구 추이", xaxis_title="월", yaxis_title="인구 수", barmode='stack')
+        st.plotly_chart(fig5, use_container_width=True)
+        if len(months) < 2:
+            st.info(f"'{MONTHLY_DIR}' 폴더에 다른 달의 CSV를 넣으면 추이를 비교할 수 있습니다.")
+
+    else:
+        gender_columns = cached_columns(GENDER_PATH)
+        male_columns = [col for col in gender_columns if '남_' in col and '세' in col]
+        female_columns = [col for col in gender_columns if '여_' in col and '세' in col]
+        age_labels_gender = [col.split('_')[-1] for col in male_columns]
+
+        # 파일 읽기 (Arrow 캐시에서 memory-map)
+        df_total = load_table(TOTAL_PATH, columns=[REGION_COLUMN] + age_columns)
+        df_gender = load_table(GENDER_PATH, columns=[REGION_COLUMN] + male_columns + female_columns)
+        gender_index = region_index(GENDER_PATH, source_key(GENDER_PATH))
+
+        # 선택 지역 행만 추출 (남녀구분 파일은 행정구역 코드로 연결)
+        total_counts = df_total[age_columns].iloc[region["row"]]
+        gender_row = gender_index["by_code"][region["code"]]["row"]
+        male_counts = df_gender[male_columns].iloc[gender_row]
+        female_counts = df_gender[female_columns].iloc[gender_row]
+
+        # 전체 인구 분포 시각화
+        fig1 = go.Figure()
+        fig1.add_trace(go.Bar(x=age_labels, y=total_counts, name='전체 인구', marker_color='indigo'))
+        fig1.update_layout(title=f"{region_name} 전체 인구의 연령별 분포", xaxis_title="연령", yaxis_title="인구 수")
+
+        # 남녀 인구 분포 시각화
+        fig2 = go.Figure()
+        fig2.add_trace(go.Bar(x=age_labels_gender, y=male_counts, name='남성', marker_color='blue'))
+        fig2.add_trace(go.Bar(x=age_labels_gender, y=female_counts, name='여성', marker_color='pink'))
+        fig2.update_layout(title=f"{region_name} 남성과 여성 인구의 연령별 비교", xaxis_title="연령", yaxis_title="인구 수", barmode='group')
+
+        # 출력
+        with span("population.plotly_chart"):
+            st.plotly_chart(fig1, use_container_width=True)
+            st.plotly_chart(fig2, use_container_width=True)
 
 except FileNotFoundError:
     st.error("❌ '합계.csv' 또는 '남녀구분.csv' 파일이 현재 디렉토리에 존재하지 않습니다.")
@@ -0,0 +1,446 @@
+# population_data.py - 행정안전부 주민등록 인구 CSV 적재/캐시 모듈
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from telemetry import timed
+
+# 캐시 폴더 이름 (원본 CSV 파일과 같은 폴더 안에 생성)
+CACHE_DIR = ".cache"
+REGION_COLUMN = "행정구역"
+
+_build_locks = {}  # 원본 CSV 경로 → 캐시 생성 잠금 (백그라운드 warm-up과 첫 페이지 실행이 겹칠 때)
+_build_locks_guard = threading.Lock()
+
+
+# 원본 파일 해시 (mtime이 바뀌었을 때만 계산)
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# cache_dir를 따로 주지 않으면 작업 폴더와 상관없이 CSV 옆의 .cache 폴더
+def _cache_dir(path, cache_dir=None):
+    return cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+
+
+def _manifest_path(path, cache_dir):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}.json")
+
+
+def _read_manifest(path, cache_dir):
+    try:
+        with open(_manifest_path(path, cache_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(path, cache_dir, manifest):
+    target = _manifest_path(path, cache_dir)
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, target)
+
+
+# cp949 CSV를 한 번만 해석: 콤마 숫자 → 정수형 컬럼
+@timed("population.parse_csv")
+def parse_csv(path):
+    df = pd.read_csv(path, encoding="cp949", thousands=",")
+    for col in df.columns:
+        if col != REGION_COLUMN:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int32")
+    return df
+
+
+# 원본 CSV 또는 누적 저장소 폴더 경로마다 잠금 하나
+def _build_lock(path):
+    with _build_locks_guard:
+        return _build_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+# directory 안에 겹치지 않는 임시 파일 경로 (다 쓴 뒤 os.replace로 옮김)
+def _temp_path(directory, name):
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}-", suffix=".tmp")
+    os.close(fd)
+    return tmp
+
+
+# 원본 CSV → Arrow(Feather) 캐시 생성. 이미 최신이면 그대로 사용
+# 같은 파일의 캐시는 한 번에 한 스레드만 만듦 (나중에 온 쪽은 먼저 만든 캐시를 그대로 씀)
+def ingest(path, cache_dir=None):
+    with _build_lock(path):
+        return _ingest(path, _cache_dir(path, cache_dir))
+
+
+def _ingest(path, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(path)
+    manifest = _read_manifest(path, cache_dir)
+
+    if manifest and os.path.exists(os.path.join(cache_dir, manifest["cache"])):
+        # mtime/크기가 같으면 해시 계산도 생략
+        if manifest["mtime_ns"] == stat.st_mtime_ns and manifest["size"] == stat.st_size:
+            return manifest
+        digest = file_hash(path)
+        if manifest["sha1"] == digest:
+            manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            _write_manifest(path, cache_dir, manifest)
+            return manifest
+    else:
+        digest = file_hash(path)
+
+    df = parse_csv(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_name = f"{name}-{digest[:12]}.arrow"
+    # 압축 없이 저장해야 memory_map으로 바로 읽을 수 있음
+    # 같은 폴더의 임시 파일에 다 쓴 뒤 이름을 바꿔서, 다른 스레드가 반쯤 쓴 파일을 읽지 않도록
+    tmp = _temp_path(cache_dir, name)
+    try:
+        df.to_feather(tmp, compression="uncompressed")
+        os.replace(tmp, os.path.join(cache_dir, cache_name))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    old_cache = manifest.get("cache") if manifest else None
+    manifest = {
+        "source": os.path.basename(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": digest,
+        "cache": cache_name,
+        "columns": df.columns.tolist(),
+    }
+    _write_manifest(path, cache_dir, manifest)
+    if old_cache and old_cache != cache_name:
+        try:
+            os.remove(os.path.join(cache_dir, old_cache))
+        except OSError:
+            pass
+    return manifest
+
+
+# 캐시된 컬럼 목록 (데이터를 읽지 않고 선택할 컬럼을 고를 때 사용)
+def cached_columns(path, cache_dir=None):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return pd.read_csv(path, encoding="cp949", nrows=0).columns.tolist()
+    return ingest(path, cache_dir)["columns"]
+
+
+# 필요한 컬럼만 memory-map으로 읽기. pyarrow가 없으면 CSV를 직접 해석
+@timed("population.load_table")
+def load_table(path, columns=None, cache_dir=None):
+    try:
+        from pyarrow import feather
+    except ImportError:
+        df = parse_csv(path)
+        return df[columns] if columns is not None else df
+    manifest = ingest(path, cache_dir)
+    table = feather.read_table(os.path.join(_cache_dir(path, cache_dir), manifest["cache"]), columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+# 파일이 바뀌었는지 판단하는 키 (st.cache_data 인자로 사용)
+def source_key(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# "서울특별시 종로구 청운효자동(1111051500)" → (["서울특별시", "종로구", "청운효자동"], "1111051500")
+def parse_region(label):
+    name, _, code = label.rpartition("(")
+    return name.split(), code.rstrip(")").strip()
+
+
+# 행정구역 코드로 단계 구분: 시도(XX00000000) / 시군구(XXXXX00000) / 읍면동
+def region_level(code):
+    if code[2:] == "00000000":
+        return "sido"
+    if code[5:] == "00000":
+        return "sigungu"
+    return "eupmyeondong"
+
+
+# 시도 → 시군구 → (구) → 읍면동 계층 인덱스를 한 번만 구성
+# "수원시 장안구"처럼 구가 있는 시는 구를 시 아래에 둠: 구 코드는 다섯째 자리가 0이 아니고 시 코드(앞 네 자리 + 0)가 따로 있음
+# "북부출장소 (4110500000)"처럼 시도 이름 없이 나오는 하위 지역은 코드 앞 두 자리로 시도를 찾아 붙임
+def build_region_index(labels):
+    root = {"children": {}}
+    by_path = {}
+    by_code = {}
+
+    parsed = [parse_region(label) for label in labels]
+    sido_names = {code[:2]: tokens[0] for tokens, code in parsed if tokens and region_level(code) == "sido"}
+    sigungu_tokens = {}
+    for i, (tokens, code) in enumerate(parsed):
+        parent = sido_names.get(code[:2])
+        if tokens and region_level(code) != "sido" and parent and tokens[0] != parent:
+            parsed[i] = tokens = [parent] + tokens, code
+        if tokens and region_level(code) == "sigungu":
+            sigungu_tokens[code] = tokens
+
+    def sigungu_path(tokens, code):
+        city = sigungu_tokens.get(code[:4] + "0" * 6) if code[4] != "0" else None
+        if city and tokens[:len(city)] == city and len(tokens) > len(city):
+            return (tokens[0], " ".join(city[1:]), " ".join(tokens[len(city):]))
+        return (tokens[0], " ".join(tokens[1:]))
+
+    for row, (tokens, code) in enumerate(parsed):
+        if not tokens:
+            continue
+        level = region_level(code)
+        if level == "sido":
+            path = (tokens[0],)
+        elif level == "sigungu":
+            path = sigungu_path(tokens, code)
+        else:
+            owner = code[:5] + "0" * 5
+            if owner in sigungu_tokens:
+                path = sigungu_path(sigungu_tokens[owner], owner) + (tokens[-1],)
+            else:
+                path = (tokens[0], " ".join(tokens[1:-1]), tokens[-1])
+
+        node = root
+        for key in path:
+            node = node["children"].setdefault(key, {"children": {}})
+        node.update(name=" ".join(path).strip(), code=code, level=level, row=row)
+        by_path[path] = node
+        by_code[code] = node
+
+    return {"tree": root, "by_path": by_path, "by_code": by_code}
+
+
+# 경로로 지역 찾기: find_region(index, "서울특별시", "종로구")
+def find_region(index, *path):
+    return index["by_path"].get(tuple(path))
+
+
+# 하위 지역 이름 목록 (인자가 없으면 시도 목록)
+def region_children(index, *path):
+    node = index["tree"]
+    for key in path:
+        node = node["children"].get(key)
+        if node is None:
+            return []
+    return list(node["children"])
+
+
+# "2025년06월_계_100세 이상" → 100
+def age_of(column):
+    return int(re.search(r"(\d+)세", column.rsplit("_", 1)[-1]).group(1))
+
+
+# 지역 × 연령 정수 행렬 (모든 지역을 한 번에 계산하기 위한 기본 자료)
+def age_matrix(df, age_columns):
+    ages = np.array([age_of(col) for col in age_columns])
+    return df[age_columns].to_numpy(dtype=np.int64), ages
+
+
+# 5세 단위(기본) 연령 구간 합계: 지역 × 구간 행렬과 구간 이름
+def age_bands(matrix, ages, width=5):
+    starts = np.flatnonzero(np.r_[True, np.diff(ages // width) != 0])
+    bands = np.add.reduceat(matrix, starts, axis=1)
+    lows = ages[starts] // width * width
+    labels = [f"{low}-{low + width - 1}세" for low in lows]
+    # 마지막 컬럼은 항상 "N세 이상"
+    labels[-1] = f"{lows[-1]}세 이상"
+    return bands, labels
+
+
+# 모든 지역의 요약 통계를 행렬 연산 한 번으로 계산
+def age_summary(matrix, ages, index=None):
+    total = matrix.sum(axis=1)
+    safe_total = np.where(total > 0, total, 1)
+    youth = matrix[:, ages < 15].sum(axis=1)
+    working = matrix[:, (ages >= 15) & (ages < 65)].sum(axis=1)
+    elderly = matrix[:, ages >= 65].sum(axis=1)
+    # 누적 인구가 절반을 넘는 첫 연령 = 중위 연령
+    cumulative = matrix.cumsum(axis=1)
+    median = ages[(cumulative * 2 >= total[:, None]).argmax(axis=1)]
+    safe_working = np.where(working > 0, working, 1)
+    return pd.DataFrame({
+        "총인구": total,
+        "평균연령": matrix @ ages / safe_total,
+        "중위연령": np.where(total > 0, median, 0),
+        "유소년(0-14)": youth,
+        "생산가능(15-64)": working,
+        "고령(65+)": elderly,
+        "고령 비율(%)": elderly / safe_total * 100,
+        "총부양비": (youth + elderly) / safe_working * 100,
+        "노년부양비": elderly / safe_working * 100,
+    }, index=index)
+
+
+# ───────────── 월별 누적 저장소 (long 형식) ─────────────
+# 매달 내려받는 합계/남녀구분 CSV를 (월, 지역코드, 성별, 연령, 인구) 행으로 바꿔 쌓아 둠
+HISTORY_DIR = os.path.join(CACHE_DIR, "history")
+AGE_COLUMN_PATTERN = re.compile(r"(\d{4})년(\d{2})월_(계|남|여)_(\d+)세")
+SEXES = ["계", "남", "여"]
+
+
+# 연령 컬럼 이름 → (yyyymm, 성별 번호, 연령). 총인구수 등 나머지 컬럼은 None
+def parse_age_column(column):
+    match = AGE_COLUMN_PATTERN.match(column)
+    if not match:
+        return None
+    year, month, sex, age = match.groups()
+    return int(year) * 100 + int(month), SEXES.index(sex), int(age)
+
+
+# wide CSV를 chunk 단위로 읽어 long 형식 DataFrame을 하나씩 돌려줌 (메모리 사용량 = chunk 크기)
+def iter_long_chunks(path, chunksize=500):
+    reader = pd.read_csv(path, encoding="cp949", thousands=",", chunksize=chunksize)
+    columns = None
+    for chunk in reader:
+        if columns is None:
+            columns = {col: parse_age_column(col) for col in chunk.columns}
+            names = [col for col, info in columns.items() if info]
+            meta = np.array([columns[col] for col in names], dtype=np.int32).reshape(-1, 3)
+
+        codes = np.array([int(parse_region(label)[1]) for label in chunk[REGION_COLUMN]], dtype=np.int64)
+        values = chunk[names].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(np.int32)
+        rows, cols = values.shape
+        yield pd.DataFrame({
+            "month": np.tile(meta[:, 0], rows),
+            "code": np.repeat(codes, cols),
+            "sex": pd.Categorical.from_codes(np.tile(meta[:, 1], rows).astype(np.int8), SEXES),
+            "age": np.tile(meta[:, 2], rows).astype(np.int16),
+            "count": values.ravel(),
+        }), dict(zip(codes.tolist(), chunk[REGION_COLUMN]))
+
+
+def _read_history_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "regions": {}}
+
+
+def _history_parts(store_dir):
+    return [os.path.join(store_dir, name) for name in sorted(os.listdir(store_dir)) if name.endswith(".parquet")]
+
+
+# 기존 파트에서 (월, 성별)이 covered에 있고 지역이 codes에 있는 행을 지움 → 통째로 비어 지운 파트 이름 목록
+def _drop_covered(store_dir, covered, codes):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    keys = [month * len(SEXES) + sex for month, sex in covered]
+    months = {month for month, _ in covered}
+    removed = []
+    for path in _history_parts(store_dir):
+        if not months.intersection(pq.read_table(path, columns=["month"]).column("month").unique().to_pylist()):
+            continue
+        df = pq.read_table(path).to_pandas()
+        key = df["month"].astype(np.int64) * len(SEXES) + pd.Categorical(df["sex"], categories=SEXES).codes
+        drop = key.isin(keys) & df["code"].isin(codes)
+        if not drop.any():
+            continue
+        if drop.all():
+            os.remove(path)
+            removed.append(os.path.basename(path))
+            continue
+        tmp = _temp_path(store_dir, os.path.basename(path))
+        pq.write_table(pa.Table.from_pandas(df[~drop], preserve_index=False), tmp, compression="zstd")
+        os.replace(tmp, path)
+    return removed
+
+
+# 여러 달의 CSV를 순서대로 누적 저장. 이미 넣은 파일(같은 해시)은 건너뜀
+# 같은 (월, 지역, 성별)이 다시 들어오면 나중에 넣은 파일 값으로 바꿈
+# 같은 저장소는 한 번에 한 스레드만 고침 (여러 세션이 동시에 열어도 파트/manifest가 섞이지 않도록)
+def ingest_history(paths, store_dir=HISTORY_DIR, chunksize=500):
+    os.makedirs(store_dir, exist_ok=True)
+    with _build_lock(store_dir):
+        return _ingest_history(paths, store_dir, chunksize)
+
+
+def _ingest_history(paths, store_dir, chunksize):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest = _read_history_manifest(store_dir)
+    added = []
+
+    for path in paths:
+        stat = os.stat(path)
+        entry = manifest["files"].get(os.path.abspath(path))
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            continue
+        digest = file_hash(path)
+        if any(e["sha1"] == digest for e in manifest["files"].values()):
+            manifest["files"][os.path.abspath(path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": digest, "part": None}
+            continue
+
+        # chunk 하나 = row group 하나로 바로 기록 (파일 전체를 메모리에 올리지 않음)
+        part = f"part-{digest[:12]}.parquet"
+        tmp = _temp_path(store_dir, part)
+        writer = None
+        covered, codes = set(), set()  # 이 파일에 들어 있는 (월, 성별)과 지역 코드
+        for frame, regions in iter_long_chunks(path, chunksize):
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema, compression="zstd")
+            writer.write_table(table)
+            covered.update(zip(frame["month"].unique().tolist(), frame["sex"].cat.codes.unique().tolist()))
+            codes.update(regions)
+            manifest["regions"].update({str(code): label for code, label in regions.items()})
+        if writer is None:
+            os.remove(tmp)
+            continue
+        writer.close()
+        # 같은 달을 고쳐 낸 파일이면 예전 파트에서 겹치는 (월, 지역, 성별) 행을 지워 중복 합산을 막음
+        for removed in _drop_covered(store_dir, covered, codes):
+            for e in manifest["files"].values():
+                if e["part"] == removed:
+                    e["part"] = None
+        os.replace(tmp, os.path.join(store_dir, part))
+
+        manifest["files"][os.path.abspath(path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": digest, "part": part}
+        added.append(part)
+
+    tmp = _temp_path(store_dir, "manifest.json")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(store_dir, "manifest.json"))
+    return added
+
+
+# 누적 저장소에서 필요한 지역/성별만 읽기 (parquet 필터로 row group 단위 건너뜀)
+def load_history(store_dir=HISTORY_DIR, codes=None, sex=None, columns=None):
+    import pyarrow.dataset as ds
+
+    condition = None
+    if codes is not None:
+        condition = ds.field("code").isin([int(c) for c in codes])
+    if sex is not None:
+        sex_filter = ds.field("sex") == sex
+        condition = sex_filter if condition is None else condition & sex_filter
+    # 읽는 도중 다른 스레드가 파트를 바꾸거나 지우지 않도록 같은 잠금 안에서
+    with _build_lock(store_dir):
+        parts = _history_parts(store_dir)
+        if not parts:
+            return pd.DataFrame(columns=columns or ["month", "code", "sex", "age", "count"])
+        table = ds.dataset(parts, format="parquet").to_table(columns=columns, filter=condition)
+    return table.to_pandas()
+
+
+# 저장소에 기록된 지역 코드 → 행정구역 이름
+def history_regions(store_dir=HISTORY_DIR):
+    return {int(code): label for code, label in _read_history_manifest(store_dir)["regions"].items()}
@@ -2,10 +2,11 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-import urllib.request
 import os
-import io
+from expression_stats import differential_expression, load_or_fit_pca
+from figure_cache import render_png
+from gene_index import build_gene_index, gene_label, load_platform_annotation, search_genes
+from geo_data import is_accession, load_series, sample_conditions
 
 # 폰트 깨짐 방지를 위한 기본 설정 (DejaVu Sans는 대부분 시스템에 있음)
 plt.rcParams['font.family'] = 'DejaVu Sans'
@@ -14,21 +15,45 @@ plt.rcParams['axes.labelsize'] = 10
 plt.rcParams['xtick.labelsize'] = 9
 plt.rcParams['ytick.labelsize'] = 9
 
-# 데이터 다운로드
-file_path = "GSE17669_series_matrix.txt.gz"
-file_url = "https://ftp.ncbi.nlm.nih.gov/geo/series/GSE17nnn/GSE17669/matrix/GSE17669_series_matrix.txt.gz"
+# 데이터 불러오기 (로컬 float32 저장소 → 없으면 GEO에서 내려받아 생성)
+# 서버가 내려받는 것은 기본 데이터셋뿐이고, 다른 시리즈는 서버 폴더에 파일이 있을 때만 열 수 있음
+ACCESSION = "GSE17669"
+DOWNLOADABLE = {ACCESSION}
 
+# memory-map된 행렬을 그대로 공유 (cache_data처럼 재실행마다 복사/직렬화하지 않음)
+@st.cache_resource
+def load_data(accession):
+    return load_series(accession, offline=accession not in DOWNLOADABLE)
+
+# PCA 학습 결과는 데이터셋별로 한 번만 계산 (메모리 + 저장소 폴더의 npz)
+@st.cache_resource
+def pca_model(accession, dataset_key, solver="auto"):
+    df, meta = load_data(accession)
+    cache_path = os.path.join(meta["store"], f"pca-2-{solver}.npz")
+    return load_or_fit_pca(df.to_numpy(), cache_path, n_components=2, solver=solver)
+
+# 차등 발현 결과 (전체 probe를 한 번에 계산, 조건 쌍별로 캐시)
 @st.cache_data
-def load_data():
-    if not os.path.exists(file_path):
-        urllib.request.urlretrieve(file_url, file_path)
-    df = pd.read_csv(file_path, sep='\t', comment='!', skiprows=55, index_col=0)
-    df.dropna(inplace=True)
-    return df
+def de_table(accession, dataset_key, labels, group_a, group_b):
+    df, _ = load_data(accession)
+    return differential_expression(df.to_numpy(), list(labels), group_a, group_b, index=df.index)
+
+# 유전자 검색 인덱스 (플랫폼 주석 파일이 있으면 유전자 기호/설명도 검색)
+@st.cache_resource
+def gene_search_index(accession, dataset_key, order):
+    _, meta = load_data(accession)
+    platform = (meta["series"].get("platform_id") or [""])[0]
+    return build_gene_index(order, load_platform_annotation(platform))
+
+GENE_PAGE_SIZE = 20
 
 # 페이지 설정
 st.set_page_config(page_title="보리 유전자 발현 분석", layout="wide")
-st.title("🌾 보리 유전자 발현 분석 (GSE17669)")
+accession = st.sidebar.text_input("GEO 시리즈 번호", ACCESSION).strip().upper() or ACCESSION
+if not is_accession(accession):
+    st.error(f"⚠️ '{accession}'은(는) GEO 시리즈 번호 형식이 아닙니다. GSE17669처럼 GSE 뒤에 숫자를 입력해 주세요.")
+    st.stop()
+st.title(f"🌾 보리 유전자 발현 분석 ({accession})")
 
 # 실험 개요
 with st.expander("🔍 실험 배경, 목적, 사전 설명"):
@@ -43,9 +68,29 @@ with st.expander("🔍 실험 배경, 목적, 사전 설명"):
 🧬 **유전자 발현이란?** | 유전자가 단백질로 전환되어 기능을 수행하는 과정으로, 해당 유전자의 활성 정도를 나타냅니다.
 """)
 
-df = load_data()
+try:
+    df, meta = load_data(accession)
+except FileNotFoundError:
+    st.error(f"⚠️ {accession}는 서버에 파일이 없습니다. `{accession}_series_matrix.txt.gz`를 앱 폴더에 넣어 주세요."
+             f" (자동으로 내려받는 데이터셋: {', '.join(sorted(DOWNLOADABLE))})")
+    st.stop()
+except Exception as e:
+    st.error(f"⚠️ {accession} 데이터를 불러오지 못했습니다: {e}")
+    st.stop()
 samples = df.columns.tolist()
-condition_labels = ['Normal'] * 12 + ['Drought'] * 12
+condition_labels = sample_conditions(accession, meta)
+dataset_key = meta["sha1"]
+
+# 비교할 두 조건 (기준 → 비교)
+groups = list(dict.fromkeys(condition_labels))
+de = None
+if len(groups) >= 2:
+    group_a = st.sidebar.selectbox("기준 조건", groups, index=0)
+    group_b = st.sidebar.selectbox("비교 조건", [g for g in groups if g != group_a], index=0)
+    try:
+        de = de_table(accession, dataset_key, tuple(condition_labels), group_a, group_b)
+    except ValueError as e:
+        st.sidebar.warning(str(e))
 
 # 🎻 1. Violin Plot
 st.header("🎻 1. 유전자별 발현량 비교 (Violin Plot)")
@@ -58,21 +103,49 @@ st.markdown("""
 - 양옆이 넓을수록 해당 값의 빈도가 높다는 뜻입니다.
 - 조건별 유전자 발현 패턴이 다르면 두 조건의 플롯 모양이 다르게 나타납니다.
 """)
-gene = st.selectbox("🔎 분석할 유전자를 선택하세요:", df.index.tolist())
-gene_data = df.loc[gene]
-violin_df = pd.DataFrame({
-    'Sample': samples,
-    'Expression': gene_data.values,
-    'Condition': condition_labels
-})
-fig1, ax1 = plt.subplots(figsize=(5, 3), dpi=100)
-sns.violinplot(x='Condition', y='Expression', data=violin_df, ax=ax1)
-ax1.set_title(f'{gene} Expression Comparison')
-ax1.set_xlabel("Condition")
-ax1.set_ylabel("Expression Level")
-buf1 = io.BytesIO()
-fig1.savefig(buf1, format="png", bbox_inches='tight')
-buf1.seek(0)
+# 차등 발현이 큰(p-value가 작은) 유전자부터 목록에 표시
+# 전체 목록 대신 검색어에 맞는 한 페이지만 선택 상자로 보냄
+gene_order = tuple(de.index) if de is not None else tuple(df.index)
+gene_index = gene_search_index(accession, dataset_key, gene_order)
+query = st.text_input("🔎 유전자 검색 (probe ID, 유전자 기호, 설명)", "")
+if st.session_state.get("gene_query") != query:
+    st.session_state.gene_query = query
+    st.session_state.gene_page = 0
+page = st.session_state.gene_page
+matches, has_more = search_genes(gene_index, query, offset=page * GENE_PAGE_SIZE, limit=GENE_PAGE_SIZE)
+
+col_prev, col_info, col_next = st.columns([1, 4, 1])
+if col_prev.button("◀ 이전", disabled=page == 0):
+    st.session_state.gene_page -= 1
+    st.rerun()
+if col_next.button("다음 ▶", disabled=not has_more):
+    st.session_state.gene_page += 1
+    st.rerun()
+col_info.caption(f"{page + 1} 페이지 · {len(matches)}개 표시")
+
+if not matches:
+    st.warning("검색 결과가 없습니다.")
+    st.stop()
+gene = st.selectbox("🧬 분석할 유전자를 선택하세요:", matches, format_func=lambda probe: gene_label(gene_index, probe))
+if de is not None:
+    row = de.loc[gene]
+    st.markdown(f"log2 FC (`{group_b}` vs `{group_a}`): **{row['log2FC']:.2f}**, p-value: **{row['p_value']:.2e}**, FDR: **{row['FDR']:.2e}**")
+
+def draw_violin():
+    violin_df = pd.DataFrame({
+        'Sample': samples,
+        'Expression': df.loc[gene].values,
+        'Condition': condition_labels
+    })
+    fig1, ax1 = plt.subplots(figsize=(5, 3), dpi=100)
+    sns.violinplot(x='Condition', y='Expression', data=violin_df, ax=ax1)
+    ax1.set_title(f'{gene} Expression Comparison')
+    ax1.set_xlabel("Condition")
+    ax1.set_ylabel("Expression Level")
+    return fig1
+
+# 그림은 (데이터셋, 종류, 매개변수) 단위로 캐시 → 새 유전자를 고를 때만 실제로 그림
+buf1 = render_png((dataset_key, "violin", gene), draw_violin)
 st.image(buf1, caption="① 유전자 발현량 분포 비교 (Violin Plot)", use_column_width=False)
 
 # 🔥 2. Heatmap
@@ -86,17 +159,33 @@ st.markdown("""
 - 빨간색: 높은 발현 / 파란색: 낮은 발현을 나타냅니다.
 - 비슷한 색 패턴은 유전자들이 비슷한 방식으로 반응하고 있다는 것을 의미합니다.
 """)
-top_var_genes = df.var(axis=1).sort_values(ascending=False).head(50).index
-fig2, ax2 = plt.subplots(figsize=(8, 6), dpi=100)
-sns.heatmap(df.loc[top_var_genes], cmap='coolwarm', ax=ax2, cbar_kws={'shrink': 0.6})
-ax2.set_title("Top 50 Genes Expression Heatmap")
-ax2.set_xlabel("Sample")
-ax2.set_ylabel("Gene")
-buf2 = io.BytesIO()
-fig2.savefig(buf2, format="png", bbox_inches='tight')
-buf2.seek(0)
+
+heatmap_basis = "de" if de is not None else "variance"
+
+def draw_heatmap():
+    if heatmap_basis == "de":
+        top_genes = de.index[:50]
+        title = f"Top 50 Differentially Expressed Genes ({group_b} vs {group_a})"
+    else:
+        top_genes = df.var(axis=1).sort_values(ascending=False).head(50).index
+        title = "Top 50 Genes Expression Heatmap"
+    fig2, ax2 = plt.subplots(figsize=(8, 6), dpi=100)
+    sns.heatmap(df.loc[top_genes], cmap='coolwarm', ax=ax2, cbar_kws={'shrink': 0.6})
+    ax2.set_title(title)
+    ax2.set_xlabel("Sample")
+    ax2.set_ylabel("Gene")
+    return fig2
+
+heatmap_params = (group_a, group_b) if heatmap_basis == "de" else ()
+buf2 = render_png((dataset_key, "heatmap", 50, heatmap_basis, *heatmap_params), draw_heatmap)
 st.image(buf2, caption="② 상위 유전자 발현 히트맵 (Heatmap)", use_column_width=False)
 
+if de is not None:
+    with st.expander("📋 차등 발현 유전자 목록 (Welch t-test, Benjamini–Hochberg FDR)"):
+        sort_by = st.radio("정렬 기준", ["p_value", "FDR", "log2FC"], horizontal=True)
+        sort_key = (lambda col: -col.abs()) if sort_by == "log2FC" else None
+        st.dataframe(de.sort_values(sort_by, key=sort_key).head(200), use_container_width=True)
+
 # 🧬 3. PCA 시각화
 st.header("🧬 3. PCA (주성분 분석) 시각화")
 st.markdown("""
@@ -108,19 +197,22 @@ st.markdown("""
 - 가까운 점: 유사한 발현 패턴 / 멀리 떨어진 점: 서로 다른 유전자 발현 특성을 가짐
 - 각 축은 원래 데이터의 분산(정보량)을 가장 많이 보존하는 방향으로 설정됩니다.
 """)
-pca = PCA(n_components=2)
-coords = pca.fit_transform(df.T)
-pca_df = pd.DataFrame(coords, columns=['PC1', 'PC2'])
-pca_df['Condition'] = condition_labels
-fig3, ax3 = plt.subplots(figsize=(5.5, 4), dpi=100)
-sns.scatterplot(data=pca_df, x='PC1', y='PC2', hue='Condition', s=80, ax=ax3)
-explained = pca.explained_variance_ratio_ * 100
-ax3.set_title("PCA: Sample Similarity")
-ax3.set_xlabel(f"PC1 ({explained[0]:.1f}%)")
-ax3.set_ylabel(f"PC2 ({explained[1]:.1f}%)")
-buf3 = io.BytesIO()
-fig3.savefig(buf3, format="png", bbox_inches='tight')
-buf3.seek(0)
+
+pca_solver = st.sidebar.selectbox("PCA 계산 방식", ["auto", "full", "randomized"])
+
+def draw_pca():
+    pca = pca_model(accession, dataset_key, pca_solver)
+    pca_df = pd.DataFrame(pca["coords"], columns=['PC1', 'PC2'])
+    pca_df['Condition'] = condition_labels
+    fig3, ax3 = plt.subplots(figsize=(5.5, 4), dpi=100)
+    sns.scatterplot(data=pca_df, x='PC1', y='PC2', hue='Condition', s=80, ax=ax3)
+    explained = pca["explained_variance_ratio"] * 100
+    ax3.set_title("PCA: Sample Similarity")
+    ax3.set_xlabel(f"PC1 ({explained[0]:.1f}%)")
+    ax3.set_ylabel(f"PC2 ({explained[1]:.1f}%)")
+    return fig3
+
+buf3 = render_png((dataset_key, "pca", 2, pca_solver), draw_pca)
 st.image(buf3, caption="③ PCA 시각화 (샘플 간 발현 유사도)", use_column_width=False)
 
 # 🔚 결과 요약
@@ -0,0 +1,134 @@
+# reaction_sketch.py - 반응 속도 분포를 위한 병합 가능한 분위수 스케치 (DDSketch 방식)
+#
+# 값 x를 log_γ(x) 구간 번호로 바꿔 개수만 셈 (γ = (1+α)/(1-α))
+#   - 어떤 분위수든 상대 오차 α 이내로 추정 (α=1% → 0.35초는 0.3465~0.3535초)
+#   - 구간 개수는 값의 범위에만 비례 (1ms~5초 ≈ 430개) → 표본이 수백만 개여도 메모리 일정
+#   - 두 스케치는 구간별 개수를 더하기만 하면 합쳐짐 (플레이어별 → 전체)
+
+import json
+import math
+
+import numpy as np
+
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+LOG_GAMMA = math.log(GAMMA)
+MIN_VALUE = 1e-3   # 이보다 작은 값은 0 구간에 넣음
+MAX_BINS = 2048    # 이 수를 넘으면 가장 작은 구간들을 합침
+
+
+def new_sketch():
+    return {"bins": {}, "zero": 0, "count": 0, "sum": 0.0, "min": math.inf, "max": -math.inf}
+
+
+def _index(values):
+    return np.ceil(np.log(values) / LOG_GAMMA).astype(np.int64)
+
+
+# 구간 번호 → 대표값 (구간 양 끝의 상대 오차가 같아지는 지점)
+def _value(index):
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def _collapse(sketch):
+    bins = sketch["bins"]
+    if len(bins) <= MAX_BINS:
+        return
+    keys = sorted(bins)
+    extra = keys[:len(keys) - MAX_BINS + 1]
+    bins[keys[len(keys) - MAX_BINS + 1]] += sum(bins.pop(k) for k in extra)
+
+
+def add(sketch, values):
+    values = np.asarray(values, dtype=np.float64).ravel()
+    values = values[np.isfinite(values) & (values >= 0)]
+    if not len(values):
+        return sketch
+    small = values < MIN_VALUE
+    sketch["zero"] += int(small.sum())
+    indexes, counts = np.unique(_index(values[~small]), return_counts=True)
+    bins = sketch["bins"]
+    for index, count in zip(indexes.tolist(), counts.tolist()):
+        bins[index] = bins.get(index, 0) + count
+    sketch["count"] += len(values)
+    sketch["sum"] += float(values.sum())
+    sketch["min"] = min(sketch["min"], float(values.min()))
+    sketch["max"] = max(sketch["max"], float(values.max()))
+    _collapse(sketch)
+    return sketch
+
+
+# 값 하나 추가 (배열을 만들지 않는 빠른 경로, 단계별 시간 측정용)
+def add_one(sketch, value):
+    if not 0 <= value < math.inf:
+        return sketch
+    if value < MIN_VALUE:
+        sketch["zero"] += 1
+    else:
+        index = math.ceil(math.log(value) / LOG_GAMMA)
+        sketch["bins"][index] = sketch["bins"].get(index, 0) + 1
+    sketch["count"] += 1
+    sketch["sum"] += value
+    sketch["min"] = min(sketch["min"], value)
+    sketch["max"] = max(sketch["max"], value)
+    if len(sketch["bins"]) > MAX_BINS:
+        _collapse(sketch)
+    return sketch
+
+
+# other를 sketch에 합침 (sketch가 바뀜)
+def merge(sketch, other):
+    bins = sketch["bins"]
+    for index, count in other["bins"].items():
+        bins[index] = bins.get(index, 0) + count
+    sketch["zero"] += other["zero"]
+    sketch["count"] += other["count"]
+    sketch["sum"] += other["sum"]
+    sketch["min"] = min(sketch["min"], other["min"])
+    sketch["max"] = max(sketch["max"], other["max"])
+    _collapse(sketch)
+    return sketch
+
+
+# q (0~1) 분위수. 표본이 없으면 None
+def quantile(sketch, q):
+    if not sketch["count"]:
+        return None
+    rank = q * (sketch["count"] - 1)
+    seen = sketch["zero"]
+    if rank < seen:
+        return 0.0
+    for index in sorted(sketch["bins"]):
+        seen += sketch["bins"][index]
+        if seen > rank:
+            # 추정값이 실제 최소/최대를 벗어나지 않도록
+            return min(max(_value(index), sketch["min"]), sketch["max"])
+    return sketch["max"]
+
+
+def summary(sketch, quantiles=(0.5, 0.9, 0.99)):
+    result = {"count": sketch["count"], "mean": sketch["sum"] / sketch["count"] if sketch["count"] else None}
+    for q in quantiles:
+        result[f"p{round(q * 100)}"] = quantile(sketch, q)
+    return result
+
+
+# 히스토그램용: (구간 대표값 배열, 개수 배열)
+def histogram(sketch):
+    keys = sorted(sketch["bins"])
+    return np.array([_value(k) for k in keys]), np.array([sketch["bins"][k] for k in keys])
+
+
+def to_json(sketch):
+    data = dict(sketch, bins={str(k): v for k, v in sketch["bins"].items()})
+    if not sketch["count"]:
+        data["min"] = data["max"] = None
+    return json.dumps(data, separators=(",", ":"))
+
+
+def from_json(text):
+    data = json.loads(text)
+    data["bins"] = {int(k): v for k, v in data["bins"].items()}
+    if data["min"] is None:
+        data["min"], data["max"] = math.inf, -math.inf
+    return data
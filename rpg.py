@@ -1,135 +1,212 @@
 # game.py - 아르카디아 연대기: 통합 RPG 게임 (멀티엔딩, 스킬트리, 전투, 세이브 포함)
+#
+# 페이지마다 처리 함수를 PAGES에 등록하고, 현재 페이지 하나만 fragment로 그림
+#   - 페이지 안의 버튼/선택은 그 fragment만 다시 실행 (전체 스크립트 재실행 없음)
+#   - 페이지 이동은 go()로 → 바뀐 상태가 있으면 자동 저장 슬롯에 저장하고 전체 재실행
 
+import copy
 import streamlit as st
-import random
-import json
+import numpy as np
+from datetime import datetime
+from rpg_combat import BASIC_ATTACK, CLASSES, ENCOUNTERS, SKILLS, new_enemy, resolve_turn
+from rpg_save import AUTOSAVE_SLOT, NEW_GAME_STATE, SLOTS, list_slots, load_game, load_legacy, new_save_code, save_game
+from telemetry import timed
 
-# 상태 초기화
+PAGES = {}
+
+
+# 페이지 등록: @page("map") → PAGES["map"] = fragment로 감싼 함수
+# fragment만 다시 실행될 때는 main.py의 페이지 측정이 돌지 않으므로 fragment 안에서 따로 잼
+def page(*names):
+    def register(func):
+        fragment = st.fragment(timed(f"rpg.fragment.{func.__name__}")(func))
+        for name in names:
+            PAGES[name] = fragment
+        return func
+    return register
+
+
+# 상태 초기화 (새 게임 기본값만 덮어씀, 위젯 상태는 그대로)
 def init_game():
-    st.session_state.update({
-        "page": "title",
-        "player": {},
-        "inventory": ["치유 물약"],
-        "skills": [],
-        "skill_points": 3,
-        "map_unlocked": ["시작 마을"],
-        "quest_log": [],
-        "enemy": {},
-        "boss_defeated": False,
-        "ending": None
-    })
+    st.session_state.update(copy.deepcopy(NEW_GAME_STATE))
+    st.session_state.dirty = set()
+    st.session_state.notice = None
+
+
+# 바뀐 상태 키 기록 → 다음 페이지 이동 때 저장
+def touch(*keys):
+    st.session_state.dirty.update(keys)
+
+
+# 페이지 이동: 바뀐 것이 있을 때만 자동 저장하고 전체 화면을 다시 그림
+# 게임 오버로 갈 때는 저장하지 않음 (쓰러진 캐릭터로 자동 저장 슬롯을 덮어쓰지 않도록)
+def go(next_page, notice=None):
+    st.session_state.page = next_page
+    st.session_state.notice = notice
+    touch("page")
+    if next_page != "gameover" and st.session_state.get("save_code") and st.session_state.dirty - {"page"}:
+        save_game(st.session_state.save_code, AUTOSAVE_SLOT, st.session_state)
+    st.session_state.dirty = set()
+    st.rerun()
 
 # 직업 능력치
 def get_class_stats(cls):
-    stats = {
-        "전사": {"HP": 120, "MP": 30, "공격력": 15, "방어력": 10},
-        "마법사": {"HP": 80, "MP": 100, "공격력": 10, "방어력": 5},
-        "암살자": {"HP": 100, "MP": 40, "공격력": 13, "방어력": 8}
-    }
-    return stats[cls]
-# 전투 함수
-def battle(enemy_name, enemy_hp, enemy_attack, next_page, boss=False):
-    st.subheader(f"⚔️ 전투 - {enemy_name}")
-    st.progress(st.session_state.player["HP"] / 120)
-    st.write(f"👤 {st.session_state.player['이름']} (HP: {st.session_state.player['HP']})")
-    st.write(f"👹 {enemy_name} (HP: {enemy_hp})")
-    skill = st.selectbox("🌀 사용할 스킬", ["기본 공격"] + st.session_state.skills)
-    if st.button("공격 실행"):
-        dmg = st.session_state.player["공격력"] + random.randint(-2, 3)
-        if "화염구" in skill:
-            dmg += 10
-            st.session_state.player["MP"] -= 10
-        enemy_hp -= dmg
-        st.success(f"{enemy_name}에게 {dmg} 피해!")
-
-        if enemy_hp > 0:
-            edmg = max(1, enemy_attack - st.session_state.player["방어력"] + random.randint(-1, 2))
-            st.session_state.player["HP"] -= edmg
-            st.error(f"{enemy_name}의 반격! {edmg} 피해")
-        else:
-            st.success("전투에서 승리했습니다!")
-            st.session_state.page = next_page
-            if boss:
-                st.session_state.boss_defeated = True
-
-        if st.session_state.player["HP"] <= 0:
-            st.session_state.page = "gameover"
-
-# 저장/불러오기
-def save_game():
-    with open("save.json", "w") as f:
-        json.dump(st.session_state.player, f)
-
-def load_game():
-    with open("save.json", "r") as f:
-        st.session_state.player = json.load(f)
-# 페이지 구성
-if "page" not in st.session_state:
-    init_game()
+    return dict(CLASSES[cls])
+
+
+# 전투 (battle1: 숲의 망령, boss: 타락한 왕 네르자크)
+# 적 상태는 session_state.enemy에 두어 버튼을 누를 때마다 이어짐
+@page(*ENCOUNTERS)
+def battle():
+    encounter_id = st.session_state.page
+    encounter = ENCOUNTERS[encounter_id]
+    if st.session_state.enemy.get("id") != encounter_id:
+        st.session_state.enemy = new_enemy(encounter_id)
+    enemy = st.session_state.enemy
+    player = st.session_state.player
+
+    st.subheader(f"⚔️ 전투 - {enemy['이름']}")
+    skill = st.selectbox("🌀 사용할 스킬", [BASIC_ATTACK] + st.session_state.skills)
+    col1, col2 = st.columns(2)
+    attack = col1.button("공격 실행")
+    auto = col2.button("⏩ 끝까지 자동 전투")
+
+    result, log = None, []
+    if attack or auto:
+        touch("player", "enemy")
+        rng = np.random.default_rng()
+        while True:
+            result, turn_log = resolve_turn(player, enemy, skill, rng)
+            log += turn_log
+            if result or not auto:
+                break
+
+    max_hp = get_class_stats(player["직업"])["HP"]
+    st.progress(min(max(player["HP"], 0) / max_hp, 1.0))
+    st.write(f"👤 {player['이름']} (HP: {player['HP']}/{max_hp}, MP: {player['MP']})")
+    st.progress(max(enemy["HP"], 0) / enemy["최대HP"])
+    st.write(f"👹 {enemy['이름']} (HP: {max(enemy['HP'], 0)}/{enemy['최대HP']})")
+    # 자동 전투는 마지막 몇 줄만 표시
+    for kind, message in log[-6:]:
+        getattr(st, kind)(message)
+
+    if result == "win":
+        st.session_state.enemy = {}
+        if encounter["boss"]:
+            st.session_state.boss_defeated = True
+            touch("boss_defeated")
+        go(encounter["next"], "전투에서 승리했습니다!")
+    elif result == "lose":
+        st.session_state.enemy = {}
+        go("gameover")
 
-st.set_page_config(page_title="RPG: 아르카디아 연대기", layout="centered")
 
 # 타이틀
-if st.session_state.page == "title":
+@page("title")
+def title_page():
     st.title("🎮 아르카디아 연대기")
     if st.button("🆕 새 게임"):
-        st.session_state.page = "create"
-    if st.button("📂 불러오기"):
-        load_game()
-        st.success("불러오기 완료!")
-        st.session_state.page = "map"
+        go("create")
+    st.markdown("---")
+    st.subheader("📂 불러오기")
+    # 세이브 코드는 주소창(?save=)에도 남아 있어 같은 브라우저에서는 자동으로 채워짐
+    load_code = st.text_input("세이브 코드:", st.query_params.get("save", ""), type="password").strip()
+    if load_code:
+        labels = {
+            s["slot"]: f"{'자동 저장' if s['slot'] == AUTOSAVE_SLOT else '슬롯 ' + str(s['slot'])}"
+                       f" - Lv.{s['레벨']} {s['직업']} ({datetime.fromtimestamp(s['saved_at']):%m/%d %H:%M})"
+            for s in list_slots(load_code) if s and not s["broken"]
+        }
+        if labels:
+            slot = st.selectbox("슬롯", list(labels), format_func=labels.get)
+            if st.button("📂 불러오기"):
+                try:
+                    state = load_game(load_code, slot)
+                except ValueError as e:
+                    st.error(f"불러오기 실패: {e}")
+                else:
+                    st.session_state.update(state)
+                    st.session_state.save_code = st.query_params["save"] = load_code
+                    go(state["page"], "불러오기 완료!")
+        else:
+            st.info("저장된 슬롯이 없습니다.")
+    # 예전 버전의 save.json
+    legacy = load_legacy()
+    if legacy and st.button(f"📂 예전 세이브 불러오기 ({legacy['player'].get('이름', '?')})"):
+        st.session_state.update(legacy)
+        st.session_state.save_code = new_save_code()
+        st.query_params["save"] = st.session_state.save_code
+        go(legacy["page"], "불러오기 완료!")
+
 
 # 캐릭터 생성
-elif st.session_state.page == "create":
+@page("create")
+def create_page():
     st.header("👤 캐릭터 생성")
     name = st.text_input("이름:")
-    cls = st.selectbox("직업:", ["전사", "마법사", "암살자"])
+    cls = st.selectbox("직업:", list(CLASSES))
     if st.button("시작") and name:
         stats = get_class_stats(cls)
         st.session_state.player = {"이름": name, "직업": cls, "레벨": 1, **stats}
-        st.session_state.page = "skills"
+        # 새 캐릭터마다 새 세이브 코드 (주소창에도 넣어 두어 새로고침/다음 방문 때 다시 쓸 수 있게)
+        st.session_state.save_code = new_save_code()
+        st.query_params["save"] = st.session_state.save_code
+        touch("player")
+        go("skills")
+
 
 # 스킬트리
-elif st.session_state.page == "skills":
+@page("skills")
+def skills_page():
     st.title("🌟 스킬트리 선택")
+    for name, skill in SKILLS.items():
+        if name == BASIC_ATTACK:
+            continue
+        if st.checkbox(f"{name} ({skill['설명']})", key=f"skill_{name}") and st.session_state.skill_points > 0:
+            if name not in st.session_state.skills:
+                st.session_state.skills.append(name)
+                st.session_state.skill_points -= 1
+                touch("skills", "skill_points")
     st.markdown("스킬 포인트: " + str(st.session_state.skill_points))
-    if st.checkbox("화염구 (MP 10 소모, +10 피해)", key="fireball") and st.session_state.skill_points > 0:
-        if "화염구" not in st.session_state.skills:
-            st.session_state.skills.append("화염구")
-            st.session_state.skill_points -= 1
     if st.button("완료"):
-        st.session_state.page = "map"
+        go("map")
+
+
 # 맵
-elif st.session_state.page == "map":
+@page("map")
+def map_page():
     st.header("🗺️ 아르카디아 월드맵")
     region = st.radio("이동 지역", ["어둠의 숲", "마법사 탑", "고대 신전"], horizontal=True)
     if st.button("이동"):
-        if region == "어둠의 숲":
-            st.session_state.page = "battle1"
-        elif region == "마법사 탑":
-            st.session_state.page = "npc"
-        elif region == "고대 신전":
-            st.session_state.page = "boss"
+        go({"어둠의 숲": "battle1", "마법사 탑": "npc", "고대 신전": "boss"}[region])
 
-# 전투 1
-elif st.session_state.page == "battle1":
-    battle("숲의 망령", 30, 10, "map")
+    # 저장 (디스크 쓰기는 백그라운드에서)
+    st.markdown("---")
+    col1, col2 = st.columns([2, 1])
+    slot = col1.selectbox("💾 저장 슬롯", list(range(1, SLOTS + 1)), format_func=lambda n: f"슬롯 {n}")
+    if col2.button("💾 저장"):
+        save_game(st.session_state.save_code, slot, st.session_state)
+        st.success(f"슬롯 {slot}에 저장했습니다.")
+    st.caption(f"🔑 세이브 코드: `{st.session_state.save_code}` — 다른 기기에서 불러올 때 필요합니다. 다른 사람에게 알려 주지 마세요.")
 
-# 보스 전투
-elif st.session_state.page == "boss":
-    battle("타락한 왕 네르자크", 100, 20, "ending", boss=True)
 
 # NPC
-elif st.session_state.page == "npc":
+@page("npc")
+def npc_page():
     st.subheader("🧙‍♂️ 마법사 탑")
     st.markdown("마법사: '보스를 물리치기 전에 스킬을 다듬고 회복을 준비하게.'")
     if st.button("HP/MP 회복"):
         st.session_state.player["HP"] = get_class_stats(st.session_state.player["직업"])["HP"]
         st.session_state.player["MP"] = get_class_stats(st.session_state.player["직업"])["MP"]
+        touch("player")
         st.success("회복 완료!")
+    if st.button("🗺️ 월드맵으로"):
+        go("map")
+
 
 # 엔딩
-elif st.session_state.page == "ending":
+@page("ending")
+def ending_page():
     st.title("🏁 엔딩")
     if st.session_state.boss_defeated:
         st.success("🎉 진엔딩: 왕국에 평화가 찾아왔다!")
@@ -137,9 +214,26 @@ elif st.session_state.page == "ending":
         st.error("😈 배드엔딩: 세계는 어둠에 잠겼다.")
     if st.button("🔁 다시 시작"):
         init_game()
+        st.rerun()
+
 
 # 게임 오버
-elif st.session_state.page == "gameover":
+@page("gameover")
+def gameover_page():
     st.title("☠️ GAME OVER")
     if st.button("🔁 재시작"):
         init_game()
+        st.rerun()
+
+
+# 페이지 구성
+st.set_page_config(page_title="RPG: 아르카디아 연대기", layout="centered")
+
+if "page" not in st.session_state:
+    init_game()
+
+if st.session_state.notice:
+    st.success(st.session_state.notice)
+    st.session_state.notice = None
+
+PAGES[st.session_state.page]()
@@ -0,0 +1,100 @@
+# rpg_balance.py - 전투 밸런스 시뮬레이터 (화면 없이 수백만 번의 전투를 NumPy로 한꺼번에)
+# 사용: python rpg_balance.py [전투 수]
+#   직업 × 스킬 조합 × 적마다 승률과 처치까지 걸린 턴 수를 표로 출력
+
+import itertools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from rpg_combat import BASIC_ATTACK, CLASSES, ENEMIES, ENEMY_ROLL, PLAYER_ROLL, SKILLS, enemy_damage, player_damage
+
+MAX_TURNS = 200
+BATCH = 500_000  # 한 번에 배열로 돌리는 전투 수 (메모리 제한)
+
+
+# 배운 스킬 조합 전부 (기본 공격만 쓰는 경우 포함)
+def skill_builds():
+    learnable = [name for name in SKILLS if name != BASIC_ATTACK]
+    return [list(combo) for r in range(len(learnable) + 1) for combo in itertools.combinations(learnable, r)]
+
+
+def _simulate_batch(cls_stats, build, enemy_stats, n, rng, hp, mp):
+    hp = np.full(n, cls_stats["HP"] if hp is None else hp, dtype=np.int32)
+    mp = np.full(n, cls_stats["MP"] if mp is None else mp, dtype=np.int32)
+    ehp = np.full(n, enemy_stats["HP"], dtype=np.int32)
+    turns = np.zeros(n, dtype=np.int32)
+    won = np.zeros(n, dtype=bool)
+    active = np.arange(n)
+    # 화면과 같은 방식: 배운 스킬 중 MP가 되는 가장 센 스킬 사용
+    options = sorted([BASIC_ATTACK] + build, key=lambda name: SKILLS[name]["피해"])
+
+    for turn in range(1, MAX_TURNS + 1):
+        if not len(active):
+            break
+        cur_mp = mp[active]
+        bonus = np.zeros(len(active), dtype=np.int32)
+        cost = np.zeros(len(active), dtype=np.int32)
+        for name in options:
+            usable = cur_mp >= SKILLS[name]["MP"]
+            bonus[usable] = SKILLS[name]["피해"]
+            cost[usable] = SKILLS[name]["MP"]
+        mp[active] = cur_mp - cost
+
+        roll = rng.integers(PLAYER_ROLL[0], PLAYER_ROLL[1] + 1, size=len(active), dtype=np.int32)
+        ehp[active] -= player_damage(cls_stats["공격력"], bonus, roll)
+        killed = ehp[active] <= 0
+        won[active[killed]] = True
+        turns[active[killed]] = turn
+        active = active[~killed]
+
+        roll = rng.integers(ENEMY_ROLL[0], ENEMY_ROLL[1] + 1, size=len(active), dtype=np.int32)
+        hp[active] -= enemy_damage(enemy_stats["공격력"], cls_stats["방어력"], roll).astype(np.int32)
+        dead = hp[active] <= 0
+        turns[active[dead]] = turn
+        active = active[~dead]
+
+    return won, turns, np.where(won, hp, 0)
+
+
+# 한 직업/스킬 조합/적에 대해 n번 전투 → 승률, 처치 턴 수 분포, 남은 HP
+# hp, mp를 주면 그 상태에서 시작 (기본은 최대치)
+def simulate(cls, build, enemy, n=1_000_000, seed=None, hp=None, mp=None):
+    rng = np.random.default_rng(seed)
+    wins = []
+    turns = []
+    hp_left = []
+    for start in range(0, n, BATCH):
+        w, t, h = _simulate_batch(CLASSES[cls], list(build), ENEMIES[enemy], min(BATCH, n - start), rng, hp, mp)
+        wins.append(w)
+        turns.append(t)
+        hp_left.append(h)
+    wins, turns, hp_left = np.concatenate(wins), np.concatenate(turns), np.concatenate(hp_left)
+    win_turns = turns[wins]
+    return {
+        "직업": cls,
+        "스킬": ", ".join(build) or BASIC_ATTACK,
+        "적": enemy,
+        "전투 수": n,
+        "승률(%)": wins.mean() * 100,
+        "평균 처치 턴": win_turns.mean() if len(win_turns) else np.nan,
+        "처치 턴 p90": np.percentile(win_turns, 90) if len(win_turns) else np.nan,
+        "승리 시 남은 HP": hp_left[wins].mean() if len(win_turns) else np.nan,
+        "시간 초과(%)": (turns == 0).mean() * 100,
+    }
+
+
+# 모든 직업 × 스킬 조합 × 적 결과 표
+def balance_report(n=1_000_000, seed=0):
+    rows = [
+        simulate(cls, build, enemy, n=n, seed=seed)
+        for cls in CLASSES for build in skill_builds() for enemy in ENEMIES
+    ]
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(balance_report(n).round(2).to_string(index=False))
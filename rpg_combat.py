@@ -0,0 +1,71 @@
+# rpg_combat.py - 아르카디아 연대기 전투 데이터와 규칙 (rpg.py, rpg_balance.py에서 사용)
+# 직업/적/스킬/전투 장소는 표로만 정의하고, 피해 계산식은 화면과 시뮬레이터가 같이 씀
+
+import numpy as np
+
+# 직업 능력치
+CLASSES = {
+    "전사": {"HP": 120, "MP": 30, "공격력": 15, "방어력": 10},
+    "마법사": {"HP": 80, "MP": 100, "공격력": 10, "방어력": 5},
+    "암살자": {"HP": 100, "MP": 40, "공격력": 13, "방어력": 8},
+}
+
+# 적 능력치
+ENEMIES = {
+    "숲의 망령": {"HP": 30, "공격력": 10},
+    "타락한 왕 네르자크": {"HP": 100, "공격력": 20},
+}
+
+# 스킬: MP 소모량과 추가 피해 ("기본 공격"은 누구나 사용)
+SKILLS = {
+    "기본 공격": {"MP": 0, "피해": 0, "설명": "MP 소모 없음"},
+    "화염구": {"MP": 10, "피해": 10, "설명": "MP 10 소모, +10 피해"},
+}
+BASIC_ATTACK = "기본 공격"
+
+# 전투 페이지 → 상대와 이긴 뒤 이동할 페이지
+ENCOUNTERS = {
+    "battle1": {"enemy": "숲의 망령", "next": "map", "boss": False},
+    "boss": {"enemy": "타락한 왕 네르자크", "next": "ending", "boss": True},
+}
+
+# 피해량 난수 범위 (양 끝 포함)
+PLAYER_ROLL = (-2, 3)
+ENEMY_ROLL = (-1, 2)
+
+
+def player_damage(attack, skill_bonus, roll):
+    return attack + skill_bonus + roll
+
+
+# 반격 피해는 최소 1 (스칼라와 NumPy 배열 모두 가능)
+def enemy_damage(attack, defense, roll):
+    return np.maximum(1, attack - defense + roll)
+
+
+def new_enemy(encounter_id):
+    encounter = ENCOUNTERS[encounter_id]
+    stats = ENEMIES[encounter["enemy"]]
+    return {"id": encounter_id, "이름": encounter["enemy"], "HP": stats["HP"], "최대HP": stats["HP"], "공격력": stats["공격력"]}
+
+
+# 한 번 주고받기. player/enemy dict를 직접 고치고 (결과, 로그) 반환
+# 결과: "win" / "lose" / None(계속)
+def resolve_turn(player, enemy, skill, rng):
+    log = []
+    if SKILLS[skill]["MP"] > player["MP"]:
+        log.append(("warning", f"MP가 부족해 {BASIC_ATTACK}으로 대신합니다."))
+        skill = BASIC_ATTACK
+    player["MP"] -= SKILLS[skill]["MP"]
+    dmg = int(player_damage(player["공격력"], SKILLS[skill]["피해"], rng.integers(PLAYER_ROLL[0], PLAYER_ROLL[1] + 1)))
+    enemy["HP"] -= dmg
+    log.append(("success", f"{enemy['이름']}에게 {dmg} 피해!"))
+    if enemy["HP"] <= 0:
+        return "win", log
+
+    edmg = int(enemy_damage(enemy["공격력"], player["방어력"], rng.integers(ENEMY_ROLL[0], ENEMY_ROLL[1] + 1)))
+    player["HP"] -= edmg
+    log.append(("error", f"{enemy['이름']}의 반격! {edmg} 피해"))
+    if player["HP"] <= 0:
+        return "lose", log
+    return None, log
@@ -0,0 +1,211 @@
+# rpg_save.py - 아르카디아 연대기 세이브 슬롯 (rpg.py에서 사용)
+#
+# saves/<플레이어 키>/slot<번호>.sav
+#   파일 = 헤더(매직 "ARCS", 스키마 버전, CRC32, 길이) + zlib(JSON)
+#   - 임시 파일에 쓰고 fsync 후 os.replace → 쓰는 도중 꺼져도 이전 세이브가 그대로 남음
+#   - 실제 디스크 쓰기는 백그라운드 스레드가 처리 (같은 슬롯에 연달아 저장하면 마지막 것만 씀)
+#   - 예전 save.json(player dict만 저장)은 버전 0으로 보고 불러올 때 변환
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+from telemetry import timed
+
+log = logging.getLogger(__name__)
+
+SAVE_DIR = "saves"
+LEGACY_PATH = "save.json"
+SLOTS = 3
+AUTOSAVE_SLOT = 0  # 페이지를 옮길 때 자동으로 저장되는 슬롯
+MAGIC = b"ARCS"
+SCHEMA_VERSION = 1
+HEADER = struct.Struct("<4sHII")  # 매직, 스키마 버전, CRC32, 본문 길이
+
+# 새 게임 상태 = 세이브에 담는 session_state 키와 기본값 (게임 진행 상태 전부)
+NEW_GAME_STATE = {
+    "page": "title",
+    "player": {},
+    "inventory": ["치유 물약"],
+    "skills": [],
+    "skill_points": 3,
+    "map_unlocked": ["시작 마을"],
+    "quest_log": [],
+    "enemy": {},
+    "boss_defeated": False,
+    "ending": None,
+}
+STATE_KEYS = list(NEW_GAME_STATE)
+
+
+# 슬롯 주인은 캐릭터 이름이 아니라 새 게임마다 만드는 비밀 세이브 코드로 구분
+# (같은 이름을 고른 다른 플레이어가 내 세이브를 보거나 덮어쓰지 못하도록)
+def new_save_code():
+    return secrets.token_urlsafe(12)
+
+
+# 코드를 그대로 경로에 쓰지 않도록 해시로 폴더 이름을 만듦
+def owner_key(code):
+    return hashlib.sha256(code.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def slot_path(code, slot, save_dir=SAVE_DIR):
+    return os.path.join(save_dir, owner_key(code), f"slot{slot}.sav")
+
+
+# ───────────── 형식 변환 ─────────────
+def encode_save(state):
+    body = zlib.compress(json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+    return HEADER.pack(MAGIC, SCHEMA_VERSION, zlib.crc32(body), len(body)) + body
+
+
+# 버전 0 (save.json): player dict만 있었음 → 나머지는 새 게임 기본값
+def _from_v0(data):
+    return {**copy.deepcopy(NEW_GAME_STATE), "page": "map", "player": data}
+
+
+# 스키마 버전 → 다음 버전으로 바꾸는 함수 (버전을 올릴 때 여기에 추가)
+MIGRATIONS = {0: _from_v0}
+
+
+def _migrate(version, state):
+    while version < SCHEMA_VERSION:
+        state = MIGRATIONS[version](state)
+        version += 1
+    return state
+
+
+# 바이트 → 게임 상태. 손상되었거나 모르는 형식이면 ValueError
+def decode_save(blob):
+    if len(blob) < HEADER.size:
+        raise ValueError("세이브 파일이 너무 짧습니다.")
+    magic, version, crc, length = HEADER.unpack_from(blob)
+    body = blob[HEADER.size:]
+    if magic != MAGIC:
+        raise ValueError("세이브 파일 형식이 아닙니다.")
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"더 새로운 버전({version})의 세이브입니다.")
+    if len(body) != length or zlib.crc32(body) != crc:
+        raise ValueError("세이브 파일이 손상되었습니다.")
+    return _migrate(version, json.loads(zlib.decompress(body).decode("utf-8")))
+
+
+def _write_atomic(path, blob):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# ───────────── 백그라운드 저장 ─────────────
+_pending = {}  # 경로 → 아직 디스크에 안 쓴 바이트
+_cond = threading.Condition()
+_writer = None
+_errors = []
+
+
+def _writer_loop():
+    while True:
+        with _cond:
+            while not _pending:
+                _cond.wait()
+            path = next(iter(_pending))
+            blob = _pending[path]
+        # 어떤 오류가 나도 스레드가 죽지 않도록 기록만 하고 다음 저장을 계속 처리
+        try:
+            _write_atomic(path, blob)
+        except Exception as e:
+            log.exception("세이브 파일을 쓰지 못했습니다: %s", path)
+            _errors.append((path, str(e)))
+        with _cond:
+            # 쓰는 동안 같은 슬롯에 새 저장이 들어왔으면 남겨 둠
+            if _pending.get(path) is blob:
+                del _pending[path]
+            _cond.notify_all()
+
+
+# 게임 상태를 슬롯에 저장 (인코딩만 하고 바로 반환, 디스크 쓰기는 백그라운드)
+@timed("rpg.save_game")
+def save_game(code, slot, state, save_dir=SAVE_DIR):
+    global _writer
+    snapshot = {key: state[key] for key in STATE_KEYS if key in state}
+    snapshot["saved_at"] = time.time()
+    blob = encode_save(snapshot)
+    with _cond:
+        _pending[slot_path(code, slot, save_dir)] = blob
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="rpg-save-writer", daemon=True)
+            _writer.start()
+        _cond.notify_all()
+
+
+# 대기 중인 저장이 모두 끝날 때까지 기다림 → 다 끝났으면 True
+def flush(timeout=5.0):
+    deadline = time.time() + timeout
+    with _cond:
+        while _pending:
+            left = deadline - time.time()
+            if left <= 0:
+                return False
+            _cond.wait(left)
+    return True
+
+
+def _read(path):
+    with _cond:
+        blob = _pending.get(path)
+    if blob is None:
+        with open(path, "rb") as f:
+            blob = f.read()
+    return blob
+
+
+# 슬롯 불러오기. 없으면 None, 손상되었으면 ValueError
+def load_game(code, slot, save_dir=SAVE_DIR):
+    try:
+        return decode_save(_read(slot_path(code, slot, save_dir)))
+    except FileNotFoundError:
+        return None
+
+
+# 예전 save.json (있으면 새 형식 상태로 변환)
+def load_legacy(path=LEGACY_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return _migrate(0, json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# 자동 저장 + 슬롯별 요약 → [{"slot", "saved_at", "레벨", "직업", "page"} 또는 None]
+def list_slots(code, save_dir=SAVE_DIR):
+    slots = []
+    for slot in range(AUTOSAVE_SLOT, SLOTS + 1):
+        try:
+            state = load_game(code, slot, save_dir)
+        except ValueError:
+            state = {"broken": True}
+        if state is None:
+            slots.append(None)
+            continue
+        player = state.get("player", {})
+        slots.append({
+            "slot": slot, "saved_at": state.get("saved_at"), "broken": state.get("broken", False),
+            "레벨": player.get("레벨"), "직업": player.get("직업"), "page": state.get("page"),
+        })
+    return slots
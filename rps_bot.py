@@ -0,0 +1,93 @@
+# rps_bot.py - 가위바위보 컴퓨터 상대 전략 (test1.py에서 사용)
+#
+# 플레이어마다 고정 크기 기록(3칸 빈도 + 3×3 전이표)만 두고, 한 판마다 O(1)로 갱신
+#   - 빈도: 지금까지 가장 많이 낸 손을 예측해서 이기는 손
+#   - 마르코프: 직전에 낸 손 다음에 가장 자주 낸 손을 예측해서 이기는 손
+# 오래된 기록은 DECAY로 서서히 잊음 → 플레이어가 버릇을 바꾸면 따라감
+# 플레이어 기록은 최근 MAX_PLAYERS명까지만 보관 (LRU)
+
+import random
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MOVES = ["가위", "바위", "보"]
+INDEX = {move: i for i, move in enumerate(MOVES)}
+COUNTER = {"가위": "바위", "바위": "보", "보": "가위"}  # 이 손을 이기는 손
+DECAY = 0.95
+MAX_PLAYERS = 10_000
+
+
+def new_history():
+    return {"counts": np.zeros(3), "transitions": np.zeros((3, 3)), "last": None, "rounds": 0}
+
+
+# 플레이어가 낸 손 기록
+def record(history, move):
+    i = INDEX[move]
+    history["counts"] *= DECAY
+    history["counts"][i] += 1
+    if history["last"] is not None:
+        row = history["transitions"][history["last"]]
+        row *= DECAY
+        row[i] += 1
+    history["last"] = i
+    history["rounds"] += 1
+
+
+# 가장 큰 값 중 하나를 무작위로 (모두 0이면 None)
+def _likeliest(weights):
+    if not weights.any():
+        return None
+    best = np.flatnonzero(weights == weights.max())
+    return MOVES[random.choice(best.tolist())]
+
+
+def random_strategy(history):
+    return random.choice(MOVES)
+
+
+def frequency_strategy(history):
+    guess = _likeliest(history["counts"])
+    return COUNTER[guess] if guess else random.choice(MOVES)
+
+
+def markov_strategy(history):
+    if history["last"] is None:
+        return frequency_strategy(history)
+    guess = _likeliest(history["transitions"][history["last"]])
+    return COUNTER[guess] if guess else frequency_strategy(history)
+
+
+STRATEGIES = {
+    "무작위": random_strategy,
+    "빈도 분석": frequency_strategy,
+    "마르코프": markov_strategy,
+}
+
+
+# ───────────── 플레이어별 기록 저장소 ─────────────
+def new_store(max_players=MAX_PLAYERS):
+    return {"players": OrderedDict(), "lock": threading.Lock(), "max": max_players}
+
+
+def _history(store, player_id):
+    players = store["players"]
+    history = players.get(player_id)
+    if history is None:
+        history = players[player_id] = new_history()
+        if len(players) > store["max"]:
+            players.popitem(last=False)
+    else:
+        players.move_to_end(player_id)
+    return history
+
+
+# 컴퓨터 손을 정한 뒤 플레이어 손을 기록 (예측에는 이번 손을 쓰지 않음)
+def play(store, player_id, move, strategy="마르코프"):
+    with store["lock"]:
+        history = _history(store, player_id)
+        computer = STRATEGIES[strategy](history)
+        record(history, move)
+    return computer
@@ -0,0 +1,116 @@
+# telemetry.py - 단계별 소요 시간 측정 (모든 앱에서 사용, 결과는 admin.py와 metrics 파일로 확인)
+#
+#   with span("population.read_csv"):       # 코드 블록
+#       ...
+#   @timed("figure.savefig")                # 함수 전체
+#
+# APP_TELEMETRY=1 일 때만 측정. 꺼져 있으면 span()은 아무 일도 하지 않는 공용 객체를 돌려줌
+# 단계별 분포는 reaction_sketch 스케치에 ms 단위로 누적 (세션 구분 없이 프로세스 전체, 메모리 일정)
+# METRICS_PATH에는 FLUSH_SECONDS마다 요약을 JSON으로 저장
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+from reaction_sketch import add_one, new_sketch, summary
+
+ENABLED = os.environ.get("APP_TELEMETRY", "") not in ("", "0")
+METRICS_PATH = os.path.join(".cache", "metrics.json")
+FLUSH_SECONDS = 30
+
+_stages = {}  # 단계 이름 → {"sketch", "total", "max", "last"}
+_lock = threading.Lock()
+_flusher = None
+_NOOP = contextlib.nullcontext()  # 꺼져 있을 때 돌려주는 공용 객체 (재사용 가능)
+
+
+@contextlib.contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def span(name):
+    return _span(name) if ENABLED else _NOOP
+
+
+def timed(name):
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _span(name):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# 측정값 하나 기록 (초)
+def record(name, seconds):
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = {"sketch": new_sketch(), "total": 0.0, "max": 0.0, "last": 0.0}
+        add_one(stage["sketch"], seconds * 1000)
+        stage["total"] += seconds
+        stage["max"] = max(stage["max"], seconds)
+        stage["last"] = time.time()
+    _start_flusher()
+
+
+# 단계별 요약 → [{"stage", "count", "mean", "p50", "p90", "p99", "max", "total", "last"}] (총 시간이 큰 순)
+# mean/p50/p90/p99는 ms, max/total은 초
+def snapshot():
+    with _lock:
+        rows = [
+            {"stage": name, **summary(stage["sketch"]), "max": stage["max"], "total": stage["total"], "last": stage["last"]}
+            for name, stage in _stages.items()
+        ]
+    return sorted(rows, key=lambda row: -row["total"])
+
+
+# 히스토그램용 스케치 복사본 (ms 단위, 없으면 None)
+def stage_sketch(name):
+    with _lock:
+        stage = _stages.get(name)
+        return None if stage is None else dict(stage["sketch"], bins=dict(stage["sketch"]["bins"]))
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def write_metrics(path=METRICS_PATH):
+    data = {"written_at": time.time(), "pid": os.getpid(), "stages": snapshot()}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        try:
+            write_metrics()
+        except OSError:
+            pass
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="telemetry-flush", daemon=True)
+            _flusher.start()
@@ -1,6 +1,15 @@
 import streamlit as st
 import random
-import time
+import uuid
+from rps_bot import new_store, play, STRATEGIES
+from telemetry import span
+
+REVEAL_SECONDS = 1.2  # 결과가 나타나기 전까지 보여 주는 연출 시간
+
+# 모든 플레이어의 기록 (프로세스당 하나, 최근 플레이어만 보관)
+@st.cache_resource
+def get_bot_store():
+    return new_store()
 
 # 페이지 설정
 st.set_page_config(page_title="✊ 신박한 가위바위보", layout="centered")
@@ -8,6 +17,15 @@ st.set_page_config(page_title="✊ 신박한 가위바위보", layout="centered"
 st.title("🎮 신박한 가위바위보 게임")
 st.markdown("가위✌️, 바위✊, 보✋ 중 하나를 골라 컴퓨터와 대결해보세요!")
 
+if "player_id" not in st.session_state:
+    st.session_state.player_id = uuid.uuid4().hex
+    st.session_state.record = {"승": 0, "무": 0, "패": 0}
+
+strategy = st.selectbox(
+    "🤖 컴퓨터 전략", list(STRATEGIES), index=2,
+    help="빈도 분석/마르코프는 당신이 지금까지 낸 손을 보고 다음 손을 예측합니다.",
+)
+
 # 선택 버튼
 col1, col2, col3 = st.columns(3)
 user_choice = None
@@ -24,31 +42,55 @@ with col3:
 
 # 선택된 경우 처리
 if user_choice:
-    computer_choice = random.choice(["가위", "바위", "보"])
+    with span("rps.play"):
+        computer_choice = play(get_bot_store(), st.session_state.player_id, user_choice, strategy)
     emojis = {"가위": "✌️", "바위": "✊", "보": "✋"}
 
     st.markdown("---")
-    st.markdown("### 🌀 가위... 바위... 보!!")
-    with st.spinner("결과를 확인 중..."):
-        time.sleep(1.2)
-
-    st.markdown(f"#### 🙋‍♂️ 당신: **{user_choice} {emojis[user_choice]}**")
-    st.markdown(f"#### 🤖 컴퓨터: **{computer_choice} {emojis[computer_choice]}**")
 
     # 승패 판단
     if user_choice == computer_choice:
         result = "🤝 비겼어요!"
+        outcome = "무"
         comment = random.choice(["오! 서로 생각이 같았네요!", "다시 한번!", "무승부입니다!"])
     elif (user_choice == "가위" and computer_choice == "보") or \
          (user_choice == "바위" and computer_choice == "가위") or \
          (user_choice == "보" and computer_choice == "바위"):
         result = "🎉 승리!"
+        outcome = "승"
         comment = random.choice(["이겼어요! 멋져요!", "와우, 전략 성공!", "승리를 축하해요!"])
     else:
         result = "💥 패배..."
+        outcome = "패"
         comment = random.choice(["앗, 아쉽네요!", "다음엔 이겨봅시다!", "컴퓨터가 강하군요..."])
 
-    st.markdown("## " + result)
-    st.markdown(f"##### 💬 {comment}")
+    st.session_state.record[outcome] += 1
+
+    # 연출은 브라우저에서 CSS 애니메이션으로 (서버는 기다리지 않고 바로 결과를 보냄)
+    # round 속성이 바뀌면 새 요소로 그려져 애니메이션이 처음부터 다시 재생됨
+    st.markdown(f"""
+<style>
+@keyframes rps-shake {{ 0%, 100% {{ transform: translateY(0); }} 50% {{ transform: translateY(-12px); }} }}
+@keyframes rps-hide {{ to {{ height: 0; opacity: 0; overflow: hidden; }} }}
+@keyframes rps-show {{ to {{ opacity: 1; }} }}
+.rps-suspense {{ animation: rps-hide 0s {REVEAL_SECONDS}s forwards; }}
+.rps-suspense span {{ display: inline-block; animation: rps-shake 0.4s 3; }}
+.rps-result {{ opacity: 0; animation: rps-show 0.3s {REVEAL_SECONDS}s forwards; }}
+</style>
+<div data-round="{sum(st.session_state.record.values())}">
+  <div class="rps-suspense"><h3>🌀 가위... 바위... 보!! <span>✊</span></h3></div>
+  <div class="rps-result">
+    <h4>🙋‍♂️ 당신: <b>{user_choice} {emojis[user_choice]}</b></h4>
+    <h4>🤖 컴퓨터: <b>{computer_choice} {emojis[computer_choice]}</b></h4>
+    <h2>{result}</h2>
+    <h5>💬 {comment}</h5>
+  </div>
+</div>
+""", unsafe_allow_html=True)
+
+# 전적
+record = st.session_state.record
+if sum(record.values()):
+    st.caption(f"📊 전적: {record['승']}승 {record['무']}무 {record['패']}패")
 
 
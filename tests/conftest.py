@@ -0,0 +1,5 @@
+# 테스트에서 저장소 최상위 모듈(bookmark_codec 등)을 바로 import할 수 있도록
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+# bookmark_codec.py - 공유 링크 인코딩 왕복과 잘못된 토큰 거부
+
+import base64
+import json
+import urllib.parse
+import zlib
+
+import pytest
+
+from bookmark_codec import PREFIX, SCALE, decode_bookmarks, encode_bookmarks
+
+BOOKMARKS = [
+    {"name": "서울시청", "description": "시청 앞 광장", "lat": 37.566535, "lon": 126.977969},
+    {"name": "서울시청", "description": "", "lat": 37.566536, "lon": 126.977968},
+    {"name": "Sydney Opera House", "description": "", "lat": -33.856784, "lon": 151.215297},
+    {"name": "🌋 Teide", "description": "Tenerife", "lat": 28.272336, "lon": -16.642508},
+]
+
+
+def _token(payload, corrupt=False):
+    packed = bytearray(zlib.compress(payload))
+    if corrupt:
+        packed[-1] ^= 0xFF
+    return PREFIX + base64.urlsafe_b64encode(bytes(packed)).rstrip(b"=").decode("ascii")
+
+
+def test_round_trip_keeps_names_and_coordinates():
+    token = encode_bookmarks(BOOKMARKS)
+    assert token.startswith(PREFIX)
+    decoded = decode_bookmarks(token)
+    assert [bm["name"] for bm in decoded] == [bm["name"] for bm in BOOKMARKS]
+    assert [bm["description"] for bm in decoded] == [bm["description"] for bm in BOOKMARKS]
+    for got, want in zip(decoded, BOOKMARKS):
+        assert got["lat"] == pytest.approx(want["lat"], abs=0.5 / SCALE)
+        assert got["lon"] == pytest.approx(want["lon"], abs=0.5 / SCALE)
+
+
+def test_round_trip_empty_list():
+    assert decode_bookmarks(encode_bookmarks([])) == []
+
+
+def test_token_is_url_safe():
+    token = encode_bookmarks(BOOKMARKS)
+    assert urllib.parse.quote(token, safe="") == token
+
+
+def test_legacy_json_link_still_decodes():
+    legacy = urllib.parse.quote(json.dumps(BOOKMARKS[:1], ensure_ascii=False))
+    assert decode_bookmarks(legacy) == BOOKMARKS[:1]
+
+
+@pytest.mark.parametrize("token", [
+    "v1.!!!!",                          # base64가 아님 → 빈 zlib 데이터
+    _token(b"\x00\x00", corrupt=True),  # zlib 체크섬이 틀림
+    _token(b"\x05"),                    # 북마크 5개라면서 나머지가 없음
+    _token(b"\x01\x01\x05ab"),          # 문자열 길이가 데이터보다 긺 → 본문이 잘림
+    _token(b"\x01\x01\x01a\x00\x00\x07\x00"),  # 없는 문자열 번호 참조
+    _token(b"\x01\x01\x02\xff\xfe\x00\x00\x00\x00"),  # UTF-8이 아닌 이름
+    "not json",
+    "123",                              # 목록이 아님
+    '[{"name":"a"}]',                   # 좌표 없음
+    '[{"name":"a","lat":"abc","lon":1}]',  # 좌표가 수가 아님
+    '[{"name":"a","lat":NaN,"lon":1}]',    # 유한하지 않은 좌표
+    '[{"name":"a","lat":true,"lon":1}]',
+    '[{"name":1,"lat":1,"lon":1}]',     # 이름이 문자열이 아님
+    '[{"name":"a","description":[],"lat":1,"lon":1}]',
+    '[1, 2]',
+])
+def test_bad_tokens_raise_value_error(token):
+    with pytest.raises(ValueError):
+        decode_bookmarks(token)
+
+
+def test_truncated_token_raises_value_error():
+    token = encode_bookmarks(BOOKMARKS)
+    with pytest.raises(ValueError):
+        decode_bookmarks(token[:len(token) // 2])
@@ -0,0 +1,61 @@
+# bookmark_io.py - GeoJSON 스트리밍 파서와 가져오기 검증
+
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from bookmark_io import import_bookmarks, iter_geojson
+from bookmark_store import connect, count_bookmarks
+
+
+def _geojson(features, **extra):
+    return io.BytesIO(json.dumps({"type": "FeatureCollection", **extra, "features": features}).encode("utf-8"))
+
+
+def _point(name, lon, lat):
+    return {"type": "Feature", "properties": {"name": name},
+            "geometry": {"type": "Point", "coordinates": [lon, lat]}}
+
+
+def test_streams_features_in_batches():
+    features = [_point(f"p{i}", 127 + i / 100, 37 + i / 100) for i in range(7)]
+    frames = list(iter_geojson(_geojson(features), batch_size=3))
+    assert [len(f) for f in frames] == [3, 3, 1]
+    rows = pd.concat(frames, ignore_index=True)
+    assert rows["name"].tolist() == [f"p{i}" for i in range(7)]
+    assert rows["lat"].iloc[-1] == pytest.approx(37.06)
+
+
+def test_features_key_after_other_members():
+    frames = list(iter_geojson(_geojson([_point("a", 1, 2)], crs={"features": "x"})))
+    assert frames[0]["name"].tolist() == ["a"]
+
+
+def test_missing_features_array_raises_value_error():
+    with pytest.raises(ValueError):
+        list(iter_geojson(io.BytesIO(b'{"type": "FeatureCollection"}')))
+
+
+def test_truncated_feature_raises_value_error():
+    with pytest.raises(ValueError):
+        list(iter_geojson(io.BytesIO(b'{"features": [{"type": "Feature", ')))
+
+
+def test_non_object_features_count_as_invalid(tmp_path):
+    conn = connect(str(tmp_path / "bm.db"))
+    features = [1, "x", None, [1, 2], {"geometry": 5, "properties": []},
+                {"geometry": {"type": "Point", "coordinates": 3}}, _point("ok", 127.0, 37.5)]
+    stats = import_bookmarks(conn, _geojson(features), "geojson")
+    assert stats == {"read": 7, "added": 1, "duplicates": 0, "invalid": 6}
+    assert count_bookmarks(conn) == 1
+
+
+def test_reimport_is_deduplicated(tmp_path):
+    conn = connect(str(tmp_path / "bm.db"))
+    features = [_point("a", 127.0, 37.5), _point("b", 127.1, 37.6)]
+    import_bookmarks(conn, _geojson(features), "geojson")
+    stats = import_bookmarks(conn, _geojson(features), "geojson")
+    assert stats["added"] == 0 and stats["duplicates"] == 2
+    assert count_bookmarks(conn) == 2
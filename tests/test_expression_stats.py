@@ -0,0 +1,55 @@
+# expression_stats.py - Welch t-test와 BH FDR을 scipy.stats 결과와 비교
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from expression_stats import bh_fdr, differential_expression
+
+
+@pytest.fixture
+def expression():
+    rng = np.random.default_rng(0)
+    values = rng.normal(8, 1, (500, 9))
+    values[:50, 4:] += rng.uniform(0.5, 3, (50, 1))  # 일부 probe만 차등 발현
+    labels = ["control"] * 4 + ["drought"] * 5
+    return values, labels
+
+
+def test_welch_t_and_p_match_scipy(expression):
+    values, labels = expression
+    de = differential_expression(values, labels, "control", "drought", index=range(len(values)), is_log=True)
+    de = de.sort_index()
+    expected = stats.ttest_ind(values[:, 4:], values[:, :4], axis=1, equal_var=False)
+    np.testing.assert_allclose(de["t"], expected.statistic, rtol=1e-10)
+    np.testing.assert_allclose(de["p_value"], expected.pvalue, rtol=1e-8, atol=1e-300)
+    np.testing.assert_allclose(de["log2FC"], values[:, 4:].mean(axis=1) - values[:, :4].mean(axis=1))
+
+
+def test_fdr_matches_scipy(expression):
+    values, labels = expression
+    de = differential_expression(values, labels, "control", "drought", is_log=True)
+    np.testing.assert_allclose(de["FDR"], stats.false_discovery_control(de["p_value"], method="bh"), rtol=1e-10)
+
+
+def test_bh_fdr_with_ties_and_edges():
+    p = np.array([0.01, 0.04, 0.04, 0.03, 0.5, 1.0, 0.0])
+    np.testing.assert_allclose(bh_fdr(p), stats.false_discovery_control(p, method="bh"), rtol=1e-12)
+
+
+def test_results_sorted_by_p_value(expression):
+    values, labels = expression
+    de = differential_expression(values, labels, "control", "drought", is_log=True)
+    assert de["p_value"].is_monotonic_increasing
+
+
+def test_constant_probe_gets_p_value_one():
+    values = np.array([[5.0, 5.0, 5.0, 5.0], [1.0, 2.0, 3.0, 4.0]])
+    de = differential_expression(values, ["a", "a", "b", "b"], "a", "b", index=["flat", "slope"], is_log=True)
+    assert de.loc["flat", "t"] == 0
+    assert de.loc["flat", "p_value"] == pytest.approx(1.0)
+
+
+def test_needs_two_samples_per_group():
+    with pytest.raises(ValueError):
+        differential_expression(np.ones((3, 3)), ["a", "b", "b"], "a", "b", is_log=True)
@@ -0,0 +1,68 @@
+# leaderboard.py - 같은 판을 여러 번 보내도 한 번만 기록, 순위와 반응 속도 통계
+
+import threading
+
+import pytest
+
+from leaderboard import open_leaderboard, player_stats, rank_of, reaction_stats, submit_score, top_scores
+
+
+@pytest.fixture
+def board(tmp_path):
+    board = open_leaderboard(str(tmp_path / "board.db"))
+    yield board
+    board["conn"].close()
+
+
+def test_resubmitting_a_game_is_ignored(board):
+    assert submit_score(board, "g1", "아린", 10, 0.4, hits=[0.3, 0.5], misses=1)
+    assert not submit_score(board, "g1", "아린", 10, 0.4, hits=[0.3, 0.5], misses=1)
+    # 다른 점수로 다시 보내도 처음 기록이 그대로
+    assert not submit_score(board, "g1", "아린", 99, 0.1, hits=[0.1] * 99)
+    assert top_scores(board) == [{"nickname": "아린", "score": 10, "reaction": 0.4}]
+    stats = reaction_stats(board, "아린")
+    assert (stats["games"], stats["hits"], stats["misses"], stats["count"]) == (1, 2, 1, 2)
+    assert reaction_stats(board)["games"] == 1
+    assert board["conn"].execute("SELECT count(*) FROM hits").fetchone()[0] == 2
+
+
+def test_concurrent_resubmits_record_once(board):
+    results = []
+
+    def submit():
+        results.append(submit_score(board, "g1", "아린", 10, 0.4, hits=[0.3]))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert reaction_stats(board)["hits"] == 1
+
+
+def test_second_connection_sees_the_same_game(board, tmp_path):
+    other = open_leaderboard(str(tmp_path / "board.db"))
+    try:
+        assert submit_score(board, "g1", "아린", 10, 0.4)
+        assert not submit_score(other, "g1", "아린", 10, 0.4)
+    finally:
+        other["conn"].close()
+
+
+def test_ranking_order(board):
+    submit_score(board, "a", "느림", 10, 0.5)
+    submit_score(board, "b", "빠름", 10, 0.3)
+    submit_score(board, "c", "고득점", 12, 0.9)
+    assert [row["nickname"] for row in top_scores(board)] == ["고득점", "빠름", "느림"]
+    assert top_scores(board, k=1000) == top_scores(board)
+    assert rank_of(board, 10, 0.4) == 3
+    assert rank_of(board, 13, 1.0) == 1
+
+
+def test_player_stats_sorted_by_hits(board):
+    submit_score(board, "a", "아린", 2, 0.4, hits=[0.4, 0.4])
+    submit_score(board, "b", "보라", 3, 0.3, hits=[0.3, 0.3, 0.3], misses=3)
+    rows = player_stats(board)
+    assert [row["nickname"] for row in rows] == ["보라", "아린"]
+    assert rows[0]["hit_rate"] == pytest.approx(0.5)
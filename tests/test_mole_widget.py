@@ -0,0 +1,57 @@
+# mole_widget.py - 서버가 낸 판과 브라우저 결과 대조
+
+import random
+
+import pytest
+
+from mole_widget import MIN_REACTION, TIMING_SLACK, accepted_hits, new_round
+
+
+@pytest.fixture
+def round_():
+    return new_round(duration=5, holes=5, mole_ms=800, rng=random.Random(7))
+
+
+def test_new_round_covers_the_fastest_possible_game(round_):
+    targets = round_["targets"]
+    assert len(targets) == int(5 / MIN_REACTION) + 1
+    assert all(0 <= hole < 5 for hole in targets)
+    assert all(a != b for a, b in zip(targets, targets[1:]))
+
+
+def test_single_hole_round():
+    assert set(new_round(1, 1, 800, rng=random.Random(0))["targets"]) == {0}
+
+
+def test_honest_hits_are_accepted(round_):
+    targets = round_["targets"]
+    hits = [[0, targets[0], 0.3], [1, targets[1], 0.45], [3, targets[3], 0.5]]
+    assert accepted_hits(round_, hits) == [0.3, 0.45, 0.5]
+
+
+def test_wrong_hole_and_replayed_moles_are_dropped(round_):
+    targets = round_["targets"]
+    wrong = (targets[1] + 1) % 5
+    hits = [[0, targets[0], 0.3], [0, targets[0], 0.3], [1, wrong, 0.3], [2, targets[2], 0.3]]
+    assert accepted_hits(round_, hits) == [0.3, 0.3]
+
+
+@pytest.mark.parametrize("reaction", [0.0, MIN_REACTION / 2, 0.8 + TIMING_SLACK + 0.01, float("nan"), float("inf"), "fast"])
+def test_impossible_reactions_are_dropped(round_, reaction):
+    assert accepted_hits(round_, [[0, round_["targets"][0], reaction]]) == []
+
+
+@pytest.mark.parametrize("hits", [None, "hits", {"0": 1}, [None, [1], ["a", 0, 0.3], [-1, 0, 0.3], [10 ** 6, 0, 0.3]]])
+def test_malformed_payloads_are_ignored(round_, hits):
+    assert accepted_hits(round_, hits) == []
+
+
+def test_hits_beyond_the_game_duration_are_dropped(round_):
+    targets = round_["targets"]
+    # 매번 가장 빠르게 맞혀도 5초 동안 맞힐 수 있는 수에는 한계가 있음
+    hits = [[i, hole, MIN_REACTION] for i, hole in enumerate(targets)]
+    accepted = accepted_hits(round_, hits)
+    assert len(accepted) <= int((5 + TIMING_SLACK) / MIN_REACTION)
+    # 놓친 두더지는 mole_ms씩 시간을 씀
+    late = [[0, targets[0], 0.5], [7, targets[7], 0.5]]
+    assert accepted_hits(round_, late) == [0.5]
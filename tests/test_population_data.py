@@ -0,0 +1,69 @@
+# population_data.py - 행정구역 계층 인덱스
+
+import pytest
+
+from population_data import build_region_index, find_region, region_children, region_level
+
+LABELS = [
+    "경기도  (4100000000)",
+    "북부출장소  (4110500000)",
+    "경기도 수원시 (4111000000)",
+    "경기도 수원시 장안구 (4111100000)",
+    "경기도 수원시 장안구 파장동(4111156000)",
+    "경기도 수원시 권선구 (4111300000)",
+    "경기도 수원시 권선구 세류1동(4111352000)",
+    "경기도 의정부시 (4115000000)",
+    "경기도 의정부시 의정부1동(4115051000)",
+    "세종특별자치시  (3600000000)",
+    "세종특별자치시  (3611000000)",
+    "세종특별자치시  조치원읍(3611025000)",
+]
+
+
+@pytest.fixture
+def index():
+    return build_region_index(LABELS)
+
+
+@pytest.mark.parametrize("code, level", [
+    ("4100000000", "sido"), ("4111000000", "sigungu"), ("4111100000", "sigungu"), ("4111156000", "eupmyeondong"),
+])
+def test_region_level(code, level):
+    assert region_level(code) == level
+
+
+def test_every_label_is_indexed_by_code(index):
+    assert len(index["by_code"]) == len(LABELS)
+    assert [index["by_code"][code]["row"] for code in ("4100000000", "4111156000")] == [0, 4]
+
+
+def test_districts_nest_under_their_city(index):
+    # 구는 시와 나란히 놓이지 않아 "하위 지역 비교"에서 이중으로 세지 않음
+    assert region_children(index, "경기도") == ["북부출장소", "수원시", "의정부시"]
+    assert region_children(index, "경기도", "수원시") == ["장안구", "권선구"]
+    assert region_children(index, "경기도", "수원시", "장안구") == ["파장동"]
+    dong = find_region(index, "경기도", "수원시", "권선구", "세류1동")
+    assert dong["name"] == "경기도 수원시 권선구 세류1동"
+    assert dong["code"] == "4111352000"
+
+
+def test_city_without_districts_keeps_dongs(index):
+    assert region_children(index, "경기도", "의정부시") == ["의정부1동"]
+    assert find_region(index, "경기도", "의정부시")["level"] == "sigungu"
+
+
+def test_branch_office_is_attached_to_its_sido(index):
+    # 5번째 자리가 0이 아니어도 상위 시(4110000000)가 없으면 시군구로 둠
+    office = find_region(index, "경기도", "북부출장소")
+    assert office["code"] == "4110500000"
+    assert office["name"] == "경기도 북부출장소"
+
+
+def test_sido_without_sigungu_name(index):
+    assert region_children(index, "세종특별자치시") == [""]
+    assert find_region(index, "세종특별자치시", "", "조치원읍")["row"] == 11
+
+
+def test_unknown_path(index):
+    assert find_region(index, "경기도", "없는시") is None
+    assert region_children(index, "경기도", "없는시", "장안구") == []
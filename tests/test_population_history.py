@@ -0,0 +1,72 @@
+# population_data.py - 월별 누적 저장소 (ingest_history / load_history)
+
+import threading
+
+import pandas as pd
+
+from population_data import history_regions, ingest_history, load_history
+
+SEOUL = "서울특별시  (1100000000)"
+JONGNO = "서울특별시 종로구 (1111000000)"
+
+
+def _write_month(path, month, rows, sexes=("계",)):
+    # rows: {행정구역: [0세, 1세]} → 행정구역 공공데이터와 같은 wide 형식 (cp949, 천 단위 쉼표)
+    data = {"행정구역": list(rows)}
+    for sex in sexes:
+        data[f"{month}_{sex}_총인구수"] = [f"{sum(v):,}" for v in rows.values()]
+        for age in (0, 1):
+            data[f"{month}_{sex}_{age}세"] = [f"{v[age]:,}" for v in rows.values()]
+    pd.DataFrame(data).to_csv(path, index=False, encoding="cp949")
+    return str(path)
+
+
+def _totals(store):
+    history = load_history(store, sex="계")
+    return history.groupby(["month", "code"])["count"].sum().to_dict()
+
+
+def test_months_accumulate_and_unchanged_files_are_skipped(tmp_path):
+    store = str(tmp_path / "history")
+    may = _write_month(tmp_path / "may.csv", "2025년05월", {SEOUL: [1000, 2000], JONGNO: [10, 20]})
+    june = _write_month(tmp_path / "june.csv", "2025년06월", {SEOUL: [1100, 2100], JONGNO: [11, 21]})
+    assert len(ingest_history([may, june], store, chunksize=1)) == 2
+    assert ingest_history([may, june], store) == []
+    assert _totals(store) == {
+        (202505, 1100000000): 3000, (202505, 1111000000): 30,
+        (202506, 1100000000): 3200, (202506, 1111000000): 32,
+    }
+    assert history_regions(store)[1111000000] == JONGNO
+
+
+def test_corrected_month_replaces_only_overlapping_rows(tmp_path):
+    store = str(tmp_path / "history")
+    first = _write_month(tmp_path / "june.csv", "2025년06월", {SEOUL: [1000, 2000], JONGNO: [10, 20]}, sexes=("계", "남"))
+    ingest_history([first], store)
+    # 같은 달 계만 종로구 값을 고쳐 다시 낸 파일: 서울 전체와 남 행은 그대로 남아야 함
+    fixed = _write_month(tmp_path / "june-fixed.csv", "2025년06월", {JONGNO: [15, 25]})
+    ingest_history([first, fixed], store)
+    assert _totals(store) == {(202506, 1100000000): 3000, (202506, 1111000000): 40}
+    male = load_history(store, codes=[1111000000], sex="남")
+    assert male["count"].sum() == 30
+
+
+def test_file_replacing_a_whole_part_removes_it(tmp_path):
+    store = str(tmp_path / "history")
+    path = tmp_path / "june.csv"
+    ingest_history([_write_month(path, "2025년06월", {SEOUL: [1, 2]})], store)
+    ingest_history([_write_month(path, "2025년06월", {SEOUL: [50, 60]})], store)
+    assert _totals(store) == {(202506, 1100000000): 110}
+    assert len(list((tmp_path / "history").glob("*.parquet"))) == 1
+
+
+def test_concurrent_ingest_does_not_double_count(tmp_path):
+    store = str(tmp_path / "history")
+    paths = [_write_month(tmp_path / f"{m}.csv", f"2025년{m:02d}월", {SEOUL: [m, m]}) for m in range(1, 5)]
+    threads = [threading.Thread(target=ingest_history, args=(paths, store)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _totals(store) == {(202500 + m, 1100000000): 2 * m for m in range(1, 5)}
+    assert not [p for p in (tmp_path / "history").iterdir() if p.name.endswith(".tmp")]
@@ -0,0 +1,63 @@
+# reaction_sketch.py - 분위수 상대 오차(ALPHA) 보장, 병합, JSON 왕복
+
+import numpy as np
+import pytest
+
+from reaction_sketch import ALPHA, add, add_one, from_json, merge, new_sketch, quantile, to_json
+
+QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999, 1.0]
+
+
+# quantile()이 고르는 실제 표본 (정렬했을 때 q * (n - 1) 번째)
+def _exact(values, q):
+    ordered = np.sort(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def _assert_within_alpha(sketch, values):
+    for q in QUANTILES:
+        exact = _exact(values, q)
+        assert abs(quantile(sketch, q) - exact) <= ALPHA * exact + 1e-12, q
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_quantiles_within_relative_error(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(-1, 0.6, 20_000)  # 반응 시간과 비슷한 분포 (초)
+    _assert_within_alpha(add(new_sketch(), values), values)
+
+
+def test_wide_range_within_relative_error():
+    values = np.geomspace(1e-2, 1e4, 5_001)
+    _assert_within_alpha(add(new_sketch(), values), values)
+
+
+def test_add_one_matches_add():
+    values = np.random.default_rng(3).lognormal(0, 1, 1_000)
+    one = new_sketch()
+    for value in values:
+        add_one(one, float(value))
+    assert one["bins"] == add(new_sketch(), values)["bins"]
+
+
+def test_merge_equals_sketch_of_all_values():
+    rng = np.random.default_rng(4)
+    parts = [rng.lognormal(-1, 0.5, 3_000), rng.lognormal(0, 0.3, 3_000)]
+    merged = merge(add(new_sketch(), parts[0]), add(new_sketch(), parts[1]))
+    whole = add(new_sketch(), np.concatenate(parts))
+    assert merged["bins"] == whole["bins"]
+    assert merged["count"] == whole["count"]
+    _assert_within_alpha(merged, np.concatenate(parts))
+
+
+def test_json_round_trip():
+    sketch = add(new_sketch(), [0.0, 0.2, 0.35, 1.5])
+    assert from_json(to_json(sketch)) == sketch
+    empty = from_json(to_json(new_sketch()))
+    assert empty == new_sketch()
+    assert quantile(empty, 0.5) is None
+
+
+def test_ignores_negative_and_non_finite_values():
+    sketch = add(new_sketch(), [0.5, -1.0, np.nan, np.inf])
+    assert sketch["count"] == 1
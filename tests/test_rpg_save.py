@@ -0,0 +1,81 @@
+# rpg_save.py - 세이브 형식 왕복, 손상 검사, 예전 형식 변환, 세이브 코드별 슬롯
+
+import json
+import struct
+import zlib
+
+import pytest
+
+from rpg_save import (
+    HEADER, MAGIC, NEW_GAME_STATE, SCHEMA_VERSION, decode_save, encode_save, flush, list_slots, load_game,
+    load_legacy, new_save_code, owner_key, save_game, slot_path,
+)
+
+STATE = {**NEW_GAME_STATE, "page": "map", "player": {"이름": "아린", "직업": "마법사", "레벨": 3}, "skills": ["화염구"]}
+
+
+def test_round_trip():
+    assert decode_save(encode_save(STATE)) == STATE
+
+
+def test_header_layout():
+    blob = encode_save(STATE)
+    magic, version, crc, length = HEADER.unpack_from(blob)
+    assert (magic, version, length) == (MAGIC, SCHEMA_VERSION, len(blob) - HEADER.size)
+    assert crc == zlib.crc32(blob[HEADER.size:])
+
+
+def _flip_last_byte(blob):
+    return blob[:-1] + bytes([blob[-1] ^ 0xFF])
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda blob: blob[:HEADER.size - 1],
+    lambda blob: b"XXXX" + blob[4:],
+    _flip_last_byte,
+    lambda blob: blob[:-1],
+    lambda blob: struct.pack("<4sH", MAGIC, SCHEMA_VERSION + 1) + blob[6:],
+])
+def test_damaged_or_unknown_saves_raise_value_error(mangle):
+    with pytest.raises(ValueError):
+        decode_save(mangle(encode_save(STATE)))
+
+
+def test_version_zero_body_is_migrated():
+    body = zlib.compress(json.dumps({"이름": "아린", "레벨": 2}).encode("utf-8"))
+    state = decode_save(HEADER.pack(MAGIC, 0, zlib.crc32(body), len(body)) + body)
+    assert state["page"] == "map"
+    assert state["player"] == {"이름": "아린", "레벨": 2}
+    assert state["inventory"] == NEW_GAME_STATE["inventory"]
+
+
+def test_legacy_json_file(tmp_path):
+    path = tmp_path / "save.json"
+    path.write_text(json.dumps({"이름": "아린"}), encoding="utf-8")
+    assert load_legacy(str(path))["player"] == {"이름": "아린"}
+    assert load_legacy(str(tmp_path / "missing.json")) is None
+
+
+def test_save_codes_do_not_share_slots(tmp_path):
+    save_dir = str(tmp_path)
+    mine, theirs = new_save_code(), new_save_code()
+    assert mine != theirs and owner_key(mine) != owner_key(theirs)
+    # 폴더 이름에 코드가 그대로 드러나지 않음
+    assert mine not in slot_path(mine, 1, save_dir)
+
+    save_game(mine, 1, {**STATE, "unrelated": "dropped"}, save_dir)
+    assert flush()
+    loaded = load_game(mine, 1, save_dir)
+    assert loaded.pop("saved_at") > 0
+    assert loaded == STATE
+    assert load_game(theirs, 1, save_dir) is None
+    assert list_slots(theirs, save_dir) == [None] * 4
+    assert list_slots(mine, save_dir)[1]["직업"] == "마법사"
+
+
+def test_broken_slot_is_listed(tmp_path):
+    code = new_save_code()
+    path = tmp_path / owner_key(code) / "slot2.sav"
+    path.parent.mkdir()
+    path.write_bytes(b"garbage")
+    assert list_slots(code, str(tmp_path))[2]["broken"]
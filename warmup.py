@@ -0,0 +1,97 @@
+# warmup.py - 앱별 무거운 라이브러리 미리 불러오기와 import 시간 측정 (main.py에서 사용)
+# 사용: python warmup.py  → 새 프로세스에서 앱마다 처음 import하는 데 걸리는 시간 표 출력
+
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# 앱 스크립트 → 처음 열 때 불러오는 무거운 모듈 (앱 스크립트의 import 순서대로)
+PAGE_MODULES = {
+    "app.py": ["folium", "streamlit_folium", "numpy", "pandas", "bookmark_io", "bookmark_store"],
+    "population.py": ["pandas", "plotly.graph_objects", "pyarrow.feather", "population_data"],
+    "project.py": ["pandas", "seaborn", "matplotlib.pyplot", "sklearn.utils.extmath", "scipy.stats",
+                   "expression_stats", "figure_cache", "gene_index", "geo_data"],
+    "game.py": ["pandas", "numpy", "leaderboard", "mole_widget", "reaction_sketch"],
+    "rpg.py": ["numpy", "rpg_combat", "rpg_save"],
+    "test1.py": ["numpy", "rps_bot"],
+}
+
+# 미리 만들어 둘 디스크 캐시 (첫 방문 때 CSV 파싱을 건너뜀)
+# 첫 페이지 실행과 겹쳐도 population_data.ingest가 잠금으로 한 번만 만들고, 다 쓴 파일만 보이게 함
+DATA_FILES = ["합계.csv"]
+
+_profile = {}  # 모듈 → 이 프로세스에서 import에 걸린 시간(초), 이미 불러온 상태였으면 0
+_lock = threading.Lock()
+_started = False
+
+
+def preload(modules):
+    for name in modules:
+        with _lock:
+            if name in _profile:
+                continue
+        loaded = name in sys.modules
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            elapsed = 0.0 if loaded else time.perf_counter() - start
+        except ImportError:
+            elapsed = None  # 설치되지 않은 선택 모듈
+        with _lock:
+            _profile[name] = elapsed
+
+
+def _preload_all():
+    for modules in PAGE_MODULES.values():
+        preload(modules)
+    from population_data import load_table
+    for path in DATA_FILES:
+        if os.path.exists(path):
+            try:
+                load_table(path)
+            except (OSError, ValueError):
+                pass
+
+
+# 서버 시작 직후 한 번: 백그라운드에서 모든 앱의 모듈과 데이터 캐시를 준비
+def start_preload():
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_preload_all, name="warmup", daemon=True).start()
+
+
+# 이 프로세스에서 측정한 모듈별 import 시간 → [(모듈, 초 또는 None)] (오래 걸린 순)
+def import_profile():
+    with _lock:
+        items = list(_profile.items())
+    return sorted(items, key=lambda item: -(item[1] or 0))
+
+
+# 새 파이썬 프로세스에서 modules를 처음 import하는 시간(초) (설치 안 된 모듈이 있으면 None)
+def cold_import_seconds(modules):
+    code = (
+        "import importlib, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"for name in {modules!r}: importlib.import_module(name)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return float(result.stdout) if result.returncode == 0 else None
+
+
+if __name__ == "__main__":
+    total = 0.0
+    for page, modules in PAGE_MODULES.items():
+        seconds = cold_import_seconds(modules)
+        total += seconds or 0
+        print(f"{page:<15} {'실패' if seconds is None else f'{seconds:6.2f}초'}")
+    shared = cold_import_seconds(sorted({m for modules in PAGE_MODULES.values() for m in modules}))
+    print(f"{'앱별 합계':<15} {total:6.2f}초  (앱마다 프로세스를 따로 띄울 때)")
+    print(f"{'한 프로세스':<15} {shared or 0:6.2f}초  (main.py 하나로 띄울 때)")